@@ -24,6 +24,7 @@ export function Navigation() {
   const handleLogout = () => {
     localStorage.removeItem('userId');
     localStorage.removeItem('userName');
+    localStorage.removeItem('authToken');
     window.location.href = '/login';
   };
 
@@ -1,11 +1,31 @@
 import { useState, useRef } from 'react';
 
+// Chunk interval for live transcription streaming (ms)
+const STREAM_TIMESLICE_MS = 1000;
+
 export function useAudioRecorder() {
   const [isRecording, setIsRecording] = useState(false);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const chunksRef = useRef<Blob[]>([]);
+  const socketRef = useRef<WebSocket | null>(null);
+
+  const openTranscriptionSocket = (sessionId: string) => {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    // Browsers cannot set headers on WebSockets, so the token goes in the query
+    const token = localStorage.getItem('authToken');
+    const query = token ? `?token=${encodeURIComponent(token)}` : '';
+    const socket = new WebSocket(
+      `${protocol}//${window.location.host}/api/sessions/${sessionId}/transcribe${query}`
+    );
+    socket.binaryType = 'arraybuffer';
+    socket.onerror = (error) => {
+      // Streaming is best-effort; /complete falls back to the uploaded recording
+      console.error('Transcription stream error:', error);
+    };
+    return socket;
+  };
 
-  const startRecording = async () => {
+  const startRecording = async (sessionId?: string) => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       const mediaRecorder = new MediaRecorder(stream, {
@@ -14,14 +34,19 @@ export function useAudioRecorder() {
 
       mediaRecorderRef.current = mediaRecorder;
       chunksRef.current = [];
+      socketRef.current = sessionId ? openTranscriptionSocket(sessionId) : null;
 
       mediaRecorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
           chunksRef.current.push(event.data);
+          const socket = socketRef.current;
+          if (socket && socket.readyState === WebSocket.OPEN) {
+            socket.send(event.data);
+          }
         }
       };
 
-      mediaRecorder.start();
+      mediaRecorder.start(sessionId ? STREAM_TIMESLICE_MS : undefined);
       setIsRecording(true);
     } catch (error) {
       console.error('Error starting audio recording:', error);
@@ -40,6 +65,11 @@ export function useAudioRecorder() {
       mediaRecorder.onstop = () => {
         const audioBlob = new Blob(chunksRef.current, { type: 'audio/webm' });
         mediaRecorder.stream.getTracks().forEach(track => track.stop());
+        const socket = socketRef.current;
+        if (socket && socket.readyState === WebSocket.OPEN) {
+          socket.send(JSON.stringify({ type: 'stop' }));
+        }
+        socketRef.current = null;
         setIsRecording(false);
         resolve(audioBlob);
       };
@@ -1,4 +1,5 @@
 import { useQuery } from '@tanstack/react-query';
+import { apiRequest } from '@/lib/queryClient';
 import { useLocation } from 'wouter';
 import { Calendar, Clock, TrendingUp, Video } from 'lucide-react';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
@@ -13,10 +14,8 @@ export default function Dashboard() {
   const { data: sessions, isLoading, error } = useQuery<Session[]>({
     queryKey: ['/api/sessions', userId],
     queryFn: async () => {
-      const response = await fetch(`/api/sessions?userId=${userId}`);
-      if (!response.ok) {
-        throw new Error(`Failed to fetch sessions: ${response.statusText}`);
-      }
+      // apiRequest sends the bearer token and throws on non-2xx responses
+      const response = await apiRequest('GET', `/api/sessions?userId=${userId}`);
       const data = await response.json();
       // Ensure we always return an array
       return Array.isArray(data) ? data : [];
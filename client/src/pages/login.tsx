@@ -49,6 +49,9 @@ export default function Login() {
         // Login successful - store user and redirect to dashboard
         localStorage.setItem('userId', data.user.id);
         localStorage.setItem('userName', data.user.name || data.user.email);
+        if (data.token) {
+          localStorage.setItem('authToken', data.token);
+        }
         
         toast({
           title: 'Welcome Back!',
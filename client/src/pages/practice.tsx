@@ -11,7 +11,7 @@ import { useAudioRecorder } from '@/hooks/use-audio-recorder';
 import { detectFaces, calculateEyeContact, analyzeFace, loadFaceDetector } from '@/lib/face-detection';
 import { analyzePosture, loadPostureDetector, getPostureColor } from '@/lib/posture-detection';
 import { useToast } from '@/hooks/use-toast';
-import { queryClient } from '@/lib/queryClient';
+import { apiRequest, authHeaders, queryClient } from '@/lib/queryClient';
 
 interface FeedbackAlert {
   message: string;
@@ -67,6 +67,7 @@ export default function Practice() {
   
   const liveFeedbackIntervalRef = useRef<NodeJS.Timeout | null>(null);
   const liveFeedbackInFlightRef = useRef(false);
+  const sessionIdRef = useRef<string | null>(null);
   const metricsRef = useRef({
     eyeContactPercentage: 0,
     postureScore: 0,
@@ -341,27 +342,21 @@ export default function Practice() {
       setIsLiveCoachUpdating(true);
       setLiveCoachError(null);
 
-      const response = await fetch('/api/feedback/live', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          eyeContactPercentage: latest.eyeContactPercentage,
-          postureScore: latest.postureScore,
-          wordsPerMinute: estimatedWPM || latest.wordsPerMinute,
-          fillerWordsCount: latest.fillerWordsCount,
-          duration: latest.duration,
-          topic: latest.topic,
-          transcript: '',
-          facePosition: facePosition,
-          headTilt: headTilt,
-          isInFrame: isInFrame,
-        }),
+      // apiRequest sends the bearer token, which the session's coaching context requires
+      const response = await apiRequest('POST', '/api/feedback/live', {
+        eyeContactPercentage: latest.eyeContactPercentage,
+        postureScore: latest.postureScore,
+        wordsPerMinute: estimatedWPM || latest.wordsPerMinute,
+        fillerWordsCount: latest.fillerWordsCount,
+        duration: latest.duration,
+        topic: latest.topic,
+        transcript: '',
+        facePosition: facePosition,
+        headTilt: headTilt,
+        isInFrame: isInFrame,
+        sessionId: sessionIdRef.current,
       });
 
-      if (!response.ok) {
-        throw new Error('Failed to fetch live feedback');
-      }
-
       const data = await response.json();
 
       setLiveCoachFeedback({
@@ -420,18 +415,12 @@ export default function Practice() {
 
     try {
       const userId = localStorage.getItem('userId');
-      const response = await fetch('/api/sessions', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ topic, userId }),
-      });
-      
-      if (!response.ok) throw new Error('Failed to create session');
-      
+      const response = await apiRequest('POST', '/api/sessions', { topic, userId });
       const data = await response.json();
       setSessionId(data.id);
+      sessionIdRef.current = data.id;
       setSessionStartTime(Date.now());
-      await startRecording();
+      await startRecording(data.id);
       setDuration(0);
       setEyeContactData([]);
       setPostureData([]);
@@ -475,6 +464,7 @@ export default function Practice() {
 
       const response = await fetch(`/api/sessions/${sessionId}/complete`, {
         method: 'POST',
+        headers: authHeaders(),
         body: formData,
       });
 
@@ -5,6 +5,7 @@ import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { ArrowLeft, LogOut, Download } from 'lucide-react';
 import { useQuery } from '@tanstack/react-query';
+import { apiRequest } from '@/lib/queryClient';
 import type { Session } from '@shared/schema';
 
 export default function Profile() {
@@ -19,6 +20,11 @@ export default function Profile() {
 
   const { data: sessions } = useQuery<Session[]>({
     queryKey: ['/api/sessions', userId],
+    queryFn: async () => {
+      const response = await apiRequest('GET', `/api/sessions?userId=${userId}`);
+      const data = await response.json();
+      return Array.isArray(data) ? data : [];
+    },
     enabled: !!userId,
   });
 
@@ -38,6 +44,7 @@ export default function Profile() {
   const handleLogout = () => {
     localStorage.removeItem('userId');
     localStorage.removeItem('userName');
+    localStorage.removeItem('authToken');
     setLocation('/login');
   };
 
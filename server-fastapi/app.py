@@ -1,24 +1,56 @@
 # server-fastapi/app.py
+import logging
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from datetime import datetime
-import time
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import inspect, text
 
 from routes import router
 from config import settings
-from database import engine, Base
-from models import User, Session  # Import models to register them
+from database import engine, Base, get_pool_stats, dispose_engines
+from models import User, Session, CompletionJob, UserStats  # Import models to register them
+from ollama_service import close_client as close_ollama_client
+from openai_service import start_transcription_pool, shutdown_transcription_pool
+from completion_worker import start_embedded_workers, stop_embedded_workers
+from metrics import MetricsMiddleware, register_gauge, render_metrics
+from compression import CompressionMiddleware
+from file_uploads import RequestSizeLimitMiddleware
+from profiling import ProfilingMiddleware, profiles_router, profiling_enabled
+from responses import DefaultJSONResponse
+from logging_config import configure_logging, start_log_listener, stop_log_listener
+
+logger = logging.getLogger("miral.app")
+
+def _upgrade_schema(conn) -> None:
+    """
+    create_all only creates missing tables; add nullable columns and
+    indexes that were introduced after a table was first created.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}'
+                ))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 def create_app() -> FastAPI:
     """
     Create and configure FastAPI application
     """
+    configure_logging()
+    
     app = FastAPI(
         title="MiralAI API",
         description="Confidence Building & Public Speaking Practice Platform",
         version="2.0.0",
+        default_response_class=DefaultJSONResponse,
     )
     
     # CORS middleware - FIX: Use get_cors_list() method
@@ -28,6 +60,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "X-Request-ID"],
     )
     
     # Custom exception handler for validation errors (422)
@@ -44,7 +77,7 @@ def create_app() -> FastAPI:
             error_messages.append(f"{field}: {message}")
         
         error_detail = "; ".join(error_messages) if error_messages else "Validation error"
-        print(f"Validation error on {request.url.path}: {error_detail}")
+        logger.info("Validation error on %s: %s", request.url.path, error_detail)
         
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -54,34 +87,29 @@ def create_app() -> FastAPI:
             }
         )
     
-    # Request logging middleware
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request details for API endpoints
-        if request.url.path.startswith("/api"):
-            formatted_time = datetime.now().strftime("%I:%M:%S %p")
-            print(f"{formatted_time} [fastapi] {request.method} {request.url.path}")
-        
-        response = await call_next(request)
-        duration = int((time.time() - start_time) * 1000)
-        
-        if request.url.path.startswith("/api"):
-            formatted_time = datetime.now().strftime("%I:%M:%S %p")
-            log_line = f"{formatted_time} [fastapi] {request.method} {request.url.path} {response.status_code} in {duration}ms"
-            
-            if len(log_line) > 80:
-                log_line = log_line[:79] + "…"
-            
-            print(log_line)
-        
-        return response
+    # Opt-in request profiling; not installed at all unless configured
+    if profiling_enabled():
+        app.add_middleware(ProfilingMiddleware)
+        app.include_router(profiles_router)
+    
+    # Refuse oversized request bodies before the multipart parser spools them
+    app.add_middleware(RequestSizeLimitMiddleware)
+    
+    # gzip/brotli for large bodies, negotiated from Accept-Encoding
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+    
+    # Per-route latency histograms and access log (pure ASGI, no BaseHTTPMiddleware)
+    app.add_middleware(MetricsMiddleware)
     
     # Include API routes
     app.include_router(router)
     
     # Initialize database tables on startup
+    @app.on_event("startup")
+    async def init_logging():
+        """Start the background log writer for this worker process"""
+        start_log_listener()
+    
     @app.on_event("startup")
     async def init_db():
         """Create database tables if they don't exist"""
@@ -89,10 +117,45 @@ def create_app() -> FastAPI:
             async with engine.begin() as conn:
                 # Create all tables
                 await conn.run_sync(Base.metadata.create_all)
-            print("✅ Database tables initialized successfully")
+                await conn.run_sync(_upgrade_schema)
+            logger.info("Database tables initialized")
         except Exception as e:
-            print(f"⚠️  Warning: Could not initialize database tables: {e}")
-            print("   Make sure your database is accessible and DATABASE_URL is correct")
+            logger.warning(
+                "Could not initialize database tables: %s. "
+                "Make sure your database is accessible and DATABASE_URL is correct", e
+            )
+    
+    @app.on_event("startup")
+    async def init_transcription_pool():
+        """Preload the Vosk model and fork transcription workers"""
+        start_transcription_pool()
+    
+    @app.on_event("startup")
+    async def init_completion_workers():
+        """Start in-process workers for queued session completions"""
+        start_embedded_workers()
+    
+    @app.on_event("shutdown")
+    async def close_completion_workers():
+        await stop_embedded_workers()
+    
+    @app.on_event("shutdown")
+    async def close_ollama():
+        """Release pooled Ollama connections"""
+        await close_ollama_client()
+    
+    @app.on_event("shutdown")
+    async def close_transcription_pool():
+        shutdown_transcription_pool()
+    
+    @app.on_event("shutdown")
+    async def close_database_pools():
+        """Close pooled primary and replica connections"""
+        await dispose_engines()
+    
+    @app.on_event("shutdown")
+    async def flush_logs():
+        stop_log_listener()
     
     # Root endpoint
     @app.get("/")
@@ -108,4 +171,21 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy"}
     
+    # Connection pool saturation (per worker process)
+    @app.get("/health/db-pool")
+    async def db_pool_stats():
+        return get_pool_stats()
+    
+    register_gauge(
+        "db_pool_connections",
+        "Primary database pool connections by state",
+        "state",
+        lambda: {key: get_pool_stats()[key] for key in ("checked_out", "checked_in", "overflow")},
+    )
+    
+    # Prometheus scrape endpoint (per worker process)
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+    
     return app
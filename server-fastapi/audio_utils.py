@@ -1,26 +1,152 @@
 # server-fastapi/audio_utils.py
 import re
-from typing import List, Dict
+from collections import deque
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 
 FILLER_WORDS = ['um', 'uh', 'like', 'you know', 'basically', 'actually', 'literally', 'so', 'well']
 
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+def tokenize(transcript: str) -> List[str]:
+    """Lowercase word tokens (punctuation dropped), one regex pass"""
+    return _TOKEN_RE.findall(transcript.lower())
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over word tokens: finds every occurrence of a set
+    of (possibly multi-word) phrases in one pass, linear in the token count.
+    """
+
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = list(phrases)
+        # Node 0 is the root; each node: transitions, failure link, phrase indexes ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for phrase_index, phrase in enumerate(self.phrases):
+            node = 0
+            for token in phrase.split():
+                if token not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][token] = len(self._goto) - 1
+                node = self._goto[node][token]
+            self._output[node].append(phrase_index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[int, int]]:
+        """(phrase index, index of the phrase's first token) for every match"""
+        matches = []
+        node = 0
+        for position, token in enumerate(tokens):
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            for phrase_index in self._output[node]:
+                length = len(self.phrases[phrase_index].split())
+                matches.append((phrase_index, position - length + 1))
+        return matches
+
+
+_filler_matcher = PhraseMatcher(FILLER_WORDS)
+
+def _filler_counts(matches: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    counts = [0] * len(FILLER_WORDS)
+    for phrase_index, _ in matches:
+        counts[phrase_index] += 1
+    return [
+        {"word": filler, "count": count}
+        for filler, count in zip(FILLER_WORDS, counts)
+        if count > 0
+    ]
+
 def detect_filler_words(transcript: str) -> List[Dict[str, any]]:
     """
     Detect filler words in transcript
     Matches: detectFillerWords() from audio-utils.ts
     """
-    lower_transcript = transcript.lower()
-    results = []
-    
-    for filler in FILLER_WORDS:
-        pattern = r'\b' + re.escape(filler) + r'\b'
-        matches = re.findall(pattern, lower_transcript, re.IGNORECASE)
-        count = len(matches)
-        if count > 0:
-            results.append({"word": filler, "count": count})
-    
-    return results
+    return _filler_counts(_filler_matcher.find(tokenize(transcript)))
+
+def analyze_transcript(
+    transcript: str,
+    duration_seconds: int,
+    words: Optional[List[Dict[str, Any]]] = None,
+    window_seconds: float = 30.0,
+    pause_threshold: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    Single-pass transcript analytics.
+    With Vosk word timings ([{word, start, end, conf}]) it also yields filler
+    timestamps, WPM per time window and pause statistics; without them only
+    token positions are available.
+    """
+    timed = bool(words)
+    tokens = [w.get("word", "").lower() for w in words] if timed else tokenize(transcript)
+    matches = _filler_matcher.find(tokens)
+
+    filler_positions = []
+    for phrase_index, position in matches:
+        entry = {"word": FILLER_WORDS[phrase_index], "index": position}
+        if timed:
+            entry["time"] = round(float(words[position].get("start", 0)), 2)
+        filler_positions.append(entry)
+
+    minutes = duration_seconds / 60
+    result: Dict[str, Any] = {
+        "word_count": len(tokens),
+        "words_per_minute": round(len(tokens) / minutes) if minutes > 0 else 0,
+        "filler_words": _filler_counts(matches),
+        "filler_words_count": len(matches),
+        "filler_positions": filler_positions,
+        "wpm_windows": [],
+        "pauses": None,
+    }
+    if not timed:
+        return result
+
+    # Words per window by start time, and gaps between consecutive words
+    window_counts: Dict[int, int] = {}
+    pause_count = 0
+    pause_total = 0.0
+    longest_pause = 0.0
+    previous_end = None
+    for word in words:
+        start = float(word.get("start", 0))
+        window = int(start // window_seconds)
+        window_counts[window] = window_counts.get(window, 0) + 1
+        if previous_end is not None:
+            gap = start - previous_end
+            if gap >= pause_threshold:
+                pause_count += 1
+                pause_total += gap
+                longest_pause = max(longest_pause, gap)
+        previous_end = float(word.get("end", start))
+
+    result["wpm_windows"] = [
+        {"start": window * window_seconds, "wordsPerMinute": round(count * 60 / window_seconds)}
+        for window, count in sorted(window_counts.items())
+    ]
+    result["pauses"] = {
+        "count": pause_count,
+        "totalSeconds": round(pause_total, 2),
+        "meanSeconds": round(pause_total / pause_count, 2) if pause_count else 0.0,
+        "longestSeconds": round(longest_pause, 2),
+    }
+    return result
 
 def calculate_words_per_minute(transcript: str, duration_seconds: int) -> int:
     """
@@ -1,18 +1,36 @@
 # server-fastapi/auth.py
+import asyncio
 import bcrypt
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from typing import Optional
 from config import settings
+from cache import TTLCache
+from schemas import UserResponse
+
+logger = logging.getLogger("miral.auth")
 
 SECRET_KEY = settings.session_secret
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+# while capping how many CPU-heavy hashes run at once
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.password_hash_workers),
+    thread_name_prefix="bcrypt",
+)
+
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
     # Generate salt and hash password
-    salt = bcrypt.gensalt(rounds=10)
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -25,9 +43,27 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
             hashed_password.encode('utf-8')
         )
     except Exception as e:
-        print(f"Error verifying password: {e}")
+        logger.warning("Error verifying password: %s", e)
+        return False
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a cost other than BCRYPT_ROUNDS"""
+    try:
+        # Format: $2b$<cost>$<salt+hash>
+        return int(hashed_password.split('$')[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
         return False
 
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT token"""
     to_encode = data.copy()
@@ -38,3 +74,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+def create_user_token(user) -> str:
+    """Access token carrying the user's id, email and name"""
+    return create_access_token({"sub": user.id, "email": user.email, "name": user.name})
+
+# Verified claims by token digest, so repeat requests skip signature checks and DB lookups
+_claims_cache = TTLCache(maxsize=settings.auth_claims_cache_size, ttl=ACCESS_TOKEN_EXPIRE_HOURS * 3600)
+
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+def verify_access_token(token: str) -> UserResponse:
+    """Decode and verify a JWT; raises 401 when invalid or expired"""
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    user = _claims_cache.get(digest)
+    if user is not None:
+        return user
+    
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user = UserResponse(id=claims["sub"], email=claims["email"], name=claims.get("name"))
+    except (JWTError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=401,
+            detail='Invalid or expired token',
+            headers={'WWW-Authenticate': 'Bearer'}
+        )
+    
+    # Cached entries expire together with the token
+    ttl = claims.get("exp", time.time()) - time.time()
+    if ttl > 0:
+        _claims_cache.set(digest, user, ttl=ttl)
+    return user
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme)
+) -> Optional[UserResponse]:
+    """Authenticated user from the Bearer token, or None when no token was sent"""
+    if credentials is None:
+        return None
+    return verify_access_token(credentials.credentials)
+
+async def get_current_user(
+    user: Optional[UserResponse] = Depends(get_optional_user)
+) -> UserResponse:
+    """Authenticated user; 401 without a valid Bearer token"""
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail='Not authenticated',
+            headers={'WWW-Authenticate': 'Bearer'}
+        )
+    return user
+
+def resolve_user_id(requested_user_id: Optional[str], user: Optional[UserResponse]) -> Optional[str]:
+    """
+    Pick the user id a request acts for. With a token the token wins and a
+    different explicit userId is refused; without one the legacy userId
+    parameter is trusted unless REQUIRE_AUTH is set.
+    """
+    if user is not None:
+        if requested_user_id and requested_user_id != user.id:
+            raise HTTPException(status_code=403, detail='Not allowed for this user')
+        return user.id
+    if settings.require_auth:
+        raise HTTPException(
+            status_code=401,
+            detail='Not authenticated',
+            headers={'WWW-Authenticate': 'Bearer'}
+        )
+    return requested_user_id
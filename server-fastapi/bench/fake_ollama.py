@@ -0,0 +1,99 @@
+# server-fastapi/bench/fake_ollama.py
+"""
+Fake Ollama HTTP server for benchmarks.
+
+  python server-fastapi/bench/fake_ollama.py --port 11500 --latency 0.3 --tokens-per-second 40
+
+POST /api/chat and /api/generate answer with valid feedback JSON after `latency` seconds
+(time to first token) plus `tokens / tokens-per-second` (generation).
+Requests beyond --parallel wait, like a single Ollama instance with
+OLLAMA_NUM_PARALLEL set.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+FEEDBACK = {
+    "strengths": ["Steady eye contact with the camera", "Clear structure in your answer"],
+    "improvements": ["Cut filler words like 'um' and 'you know'", "Slow down slightly on key points"],
+    "confidence_score": 72,
+    "role_specific_tips": ["Quantify the impact of your work"],
+    "summary": "Solid delivery; tighten the wording and keep the pace even.",
+}
+CONTENT = json.dumps(FEEDBACK)
+CONTENT_TOKENS = len(CONTENT) // 4  # ~4 characters per token
+
+
+def create_fake_ollama(latency: float, tokens_per_second: float, parallel: int) -> FastAPI:
+    app = FastAPI()
+    slots = asyncio.Semaphore(parallel)
+    stats = {"requests": 0}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "bench"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        started = time.perf_counter()
+        async with slots:
+            await asyncio.sleep(latency + CONTENT_TOKENS / tokens_per_second)
+        elapsed_ns = int((time.perf_counter() - started) * 1e9)
+        return {
+            "model": body.get("model", "bench"),
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": CONTENT},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": elapsed_ns,
+            "prompt_eval_count": sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4,
+            "eval_count": CONTENT_TOKENS,
+        }
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        started = time.perf_counter()
+        async with slots:
+            await asyncio.sleep(latency + CONTENT_TOKENS / tokens_per_second)
+        context = list(body.get("context") or []) + list(range(len(body.get("prompt", "")) // 4 + CONTENT_TOKENS))
+        return {
+            "model": body.get("model", "bench"),
+            "created_at": "2024-01-01T00:00:00Z",
+            "response": CONTENT,
+            "done": True,
+            "done_reason": "stop",
+            "context": context,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "eval_count": CONTENT_TOKENS,
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Ollama server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent generations")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_fake_ollama(args.latency, args.tokens_per_second, args.parallel),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
@@ -0,0 +1,178 @@
+# server-fastapi/bench/roundtrips.py
+"""
+Count database round trips per storage operation against DATABASE_URL.
+
+  python server-fastapi/bench/roundtrips.py [--iterations N]
+
+Every operation runs twice: through the current storage layer and through
+BaselineStorage, the pre-RETURNING/ON CONFLICT queries kept here for
+comparison. Prints one JSON object with, per operation, statements (SQL sent
+by SQLAlchemy, including BEGIN/COMMIT) and mean latency for both, and the
+statement delta. Rows it creates are deleted.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, select, update, func
+
+from auth import hash_password_async
+from database import engine, AsyncSessionLocal
+from models import Session, User, UserStats
+from storage import storage
+
+
+class RoundTripCounter:
+    """Counts statements, BEGINs and COMMITs issued on the engine"""
+
+    def __init__(self):
+        self.count = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._bump)
+        event.listen(sync_engine, "begin", self._bump)
+        event.listen(sync_engine, "commit", self._bump)
+
+    def _bump(self, *args, **kwargs):
+        self.count += 1
+
+
+class BaselineStorage:
+    """The storage queries as they were before RETURNING / ON CONFLICT"""
+
+    async def signup(self, email, password, name, db):
+        # The signup route checked for an existing email before inserting
+        result = await db.execute(select(User).where(User.email == email))
+        if result.scalar_one_or_none() is not None:
+            return None
+        user = User(id=str(uuid.uuid4()), email=email, password=await hash_password_async(password), name=name)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+    async def create_session(self, topic, user_id, db):
+        session = Session(
+            id=str(uuid.uuid4()), topic=topic, user_id=user_id, duration=0,
+            eye_contact_percentage=0, confidence_score=0, words_per_minute=0,
+            filler_words_count=0, transcript='', strengths=[], improvements=[],
+            eye_contact_data=[],
+        )
+        db.add(session)
+        await db.commit()
+        await db.refresh(session)
+        return session
+
+    async def update_session(self, session_id, data, db, completed=False):
+        first_completion = None
+        if completed:
+            result = await db.execute(
+                update(Session)
+                .where(Session.id == session_id, Session.completed_at.is_(None))
+                .values(completed_at=func.now())
+                .returning(Session.user_id)
+                .execution_options(synchronize_session=False)
+            )
+            first_completion = result.first()
+        await db.execute(update(Session).where(Session.id == session_id).values(**data))
+        result = await db.execute(select(Session).where(Session.id == session_id))
+        session = result.scalar_one_or_none()
+        if first_completion and first_completion.user_id:
+            await storage._record_user_stats(session, db)
+        await db.commit()
+        return session
+
+
+baseline = BaselineStorage()
+
+
+async def measure(counter, results, name, operation):
+    before = counter.count
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        value = await operation(db)
+    elapsed = time.perf_counter() - start
+    results[name]["statements"].append(counter.count - before)
+    results[name]["ms"].append(elapsed * 1000)
+    return value
+
+
+async def run_operations(counter, results, user_ids, session_ids, signup, store) -> None:
+    """One signup / session lifecycle; signup(email, db) registers a user"""
+    email = f"bench-{uuid.uuid4().hex}@example.invalid"
+    user = await measure(counter, results, "signup", lambda db: signup(email, db))
+    user_ids.append(user.id)
+    await measure(counter, results, "signup_duplicate", lambda db: signup(email, db))
+
+    session = await measure(counter, results, "create_session", lambda db: store.create_session("bench", user.id, db))
+    session_ids.append(session.id)
+    data = {"duration": 60, "confidence_score": 70, "transcript": "bench"}
+    await measure(counter, results, "complete_session", lambda db: store.update_session(session.id, data, db, completed=True))
+    await measure(counter, results, "update_session", lambda db: store.update_session(session.id, data, db))
+
+
+def summarize(results) -> dict:
+    current, before = summarize(current), summarize(before)
+    return {
+        name: {
+            "baseline_statements": before[name]["statements"],
+            "statements": stats["statements"],
+            "delta": stats["statements"] - before[name]["statements"],
+            "baseline_mean_ms": before[name]["mean_ms"],
+            "mean_ms": stats["mean_ms"],
+        }
+        for name, stats in current.items()
+    }
+
+
+async def run(iterations: int) -> dict:
+    counter = RoundTripCounter()
+    current = defaultdict(lambda: {"statements": [], "ms": []})
+    before = defaultdict(lambda: {"statements": [], "ms": []})
+    user_ids, session_ids = [], []
+
+    try:
+        for _ in range(iterations):
+            await run_operations(
+                counter, current, user_ids, session_ids,
+                lambda email, db: storage.create_user(email, "bench-password", None, db),
+                storage,
+            )
+            await run_operations(
+                counter, before, user_ids, session_ids,
+                lambda email, db: baseline.signup(email, "bench-password", None, db),
+                baseline,
+            )
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Session).where(Session.id.in_(session_ids)))
+            await db.execute(delete(UserStats).where(UserStats.user_id.in_(user_ids)))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            await db.commit()
+        await engine.dispose()
+
+    current, before = summarize(current), summarize(before)
+    return {
+        name: {
+            "baseline_statements": before[name]["statements"],
+            "statements": stats["statements"],
+            "delta": stats["statements"] - before[name]["statements"],
+            "baseline_mean_ms": before[name]["mean_ms"],
+            "mean_ms": stats["mean_ms"],
+        }
+        for name, stats in current.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.iterations)), indent=2))
@@ -0,0 +1,340 @@
+# server-fastapi/bench/run.py
+"""
+End-to-end load benchmark.
+
+  python server-fastapi/bench/run.py --duration 60 --concurrency 32 \\
+      --mix live=50,list=25,complete=10,login=15 --seed-rows 1000000 --output bench.json
+
+Starts the fake Ollama server and create_app() (with the stub recognizer)
+as subprocesses against DATABASE_URL, which should be a local Postgres;
+signs up benchmark users, optionally COPY-seeds their history, drives a
+weighted mix of requests for --duration seconds and writes one JSON
+document: throughput, p50/p95/p99 latency and error rate per operation,
+plus the commit and configuration so runs can be compared.
+
+Operations:
+  live      POST /api/feedback/live with drifting metrics (partly cache hits)
+  list      GET /api/sessions?limit=20 as a seeded user
+  complete  POST /api/sessions + POST /api/sessions/{id}/complete with a PCM WAV
+  login     POST /api/auth/login
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+import wave
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+PASSWORD = "bench-password-123"
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - {"live", "list", "complete", "login"}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _wav_bytes(seconds: float, sample_rate: int = 16000) -> bytes:
+    """Quiet 16-bit mono PCM WAV (takes the no-ffmpeg fast path)"""
+    rng = random.Random(0)
+    frames = bytes(rng.randrange(0, 8) for _ in range(int(seconds * sample_rate) * 2))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(frames)
+    return buffer.getvalue()
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=SERVER_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = defaultdict(list)
+
+    def record(self, op: str, seconds: float, ok: bool, detail: str = "") -> None:
+        self.latencies[op].append(seconds)
+        if not ok:
+            self.errors[op] += 1
+            if len(self.error_samples[op]) < 5:
+                self.error_samples[op].append(detail[:200])
+
+    def report(self, elapsed: float) -> dict:
+        operations = {}
+        total = total_errors = 0
+        for op, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            total += len(values)
+            total_errors += self.errors[op]
+            operations[op] = {
+                "count": len(values),
+                "errors": self.errors[op],
+                "error_rate": round(self.errors[op] / len(values), 4),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "error_samples": self.error_samples[op],
+            }
+        return {
+            "total": {
+                "requests": total,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total, 4) if total else 0.0,
+                "throughput_rps": round(total / elapsed, 2),
+            },
+            "operations": operations,
+        }
+
+
+async def timed(recorder: Recorder, op: str, request) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await request
+    except Exception as e:
+        recorder.record(op, time.perf_counter() - start, False, f"{type(e).__name__}: {e}")
+        return None
+    ok = response.status_code < 400
+    recorder.record(op, time.perf_counter() - start, ok, "" if ok else f"{response.status_code} {response.text}")
+    return response
+
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, users: List[dict], args):
+        self.client = client
+        self.users = users
+        self.args = args
+        self.recorder = Recorder()
+        self.wav = _wav_bytes(args.audio_seconds)
+        samples = int(args.audio_seconds)
+        self.eye_contact = json.dumps([{"timestamp": t, "hasEyeContact": t % 3 != 0} for t in range(samples)])
+        self.posture = json.dumps([
+            {"timestamp": t, "posture": "good", "confidence": 80.0} for t in range(0, samples, 2)
+        ])
+
+    async def live(self, rng: random.Random, user: dict) -> None:
+        payload = {
+            # Coarse steps so part of the traffic lands in the same cache buckets
+            "eyeContactPercentage": rng.choice(range(40, 100, 3)),
+            "postureScore": rng.choice(range(50, 100, 5)),
+            "wordsPerMinute": rng.choice(range(100, 180, 7)),
+            "fillerWordsCount": rng.randint(0, 12),
+            "duration": rng.randint(10, 300),
+            "topic": "software engineer",
+        }
+        await timed(self.recorder, "live", self.client.post("/api/feedback/live", json=payload))
+
+    async def list(self, rng: random.Random, user: dict) -> None:
+        await timed(self.recorder, "list", self.client.get(
+            "/api/sessions", params={"limit": 20, "userId": user["id"]}, headers=user["headers"]
+        ))
+
+    async def complete(self, rng: random.Random, user: dict) -> None:
+        created = await timed(self.recorder, "create_session", self.client.post(
+            "/api/sessions", json={"topic": "software engineer", "userId": user["id"]}, headers=user["headers"]
+        ))
+        if created is None or created.status_code >= 400:
+            return
+        session_id = created.json()["id"]
+        await timed(self.recorder, "complete", self.client.post(
+            f"/api/sessions/{session_id}/complete",
+            params={"mode": self.args.complete_mode},
+            data={
+                "duration": str(int(self.args.audio_seconds)),
+                "eyeContactData": self.eye_contact,
+                "postureData": self.posture,
+            },
+            files={"audio": ("bench.wav", self.wav, "audio/wav")},
+            headers=user["headers"],
+        ))
+
+    async def login(self, rng: random.Random, user: dict) -> None:
+        await timed(self.recorder, "login", self.client.post(
+            "/api/auth/login", json={"email": user["email"], "password": PASSWORD}
+        ))
+
+    async def worker(self, index: int, mix: Dict[str, int], deadline: float) -> None:
+        rng = random.Random(self.args.seed * 1000 + index)
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            op = rng.choices(names, weights)[0]
+            await getattr(self, op)(rng, rng.choice(self.users))
+
+
+async def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+async def _signup_users(client: httpx.AsyncClient, count: int, run_id: str) -> List[dict]:
+    users = []
+    for index in range(count):
+        email = f"bench-{run_id}-{index}@example.invalid"
+        response = await client.post("/api/auth/signup", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        body = response.json()
+        users.append({
+            "id": body["user"]["id"],
+            "email": email,
+            "headers": {"Authorization": f"Bearer {body['token']}"},
+        })
+    return users
+
+
+async def run(args) -> dict:
+    env = {**os.environ, "BENCH_VOSK_CHUNK_MS": str(args.vosk_chunk_ms)}
+    ollama_url = f"http://127.0.0.1:{args.ollama_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    processes = [
+        subprocess.Popen([
+            sys.executable, os.path.join(BENCH_DIR, "fake_ollama.py"),
+            "--port", str(args.ollama_port),
+            "--latency", str(args.ollama_latency),
+            "--tokens-per-second", str(args.ollama_tokens_per_second),
+            "--parallel", str(args.ollama_parallel),
+        ], env=env),
+        subprocess.Popen([
+            sys.executable, os.path.join(BENCH_DIR, "serve_app.py"),
+            "--port", str(args.app_port),
+            "--ollama-host", ollama_url,
+        ], env=env, cwd=SERVER_DIR),
+    ]
+    try:
+        await _wait_until_ready(f"{ollama_url}/api/tags", processes[0])
+        await _wait_until_ready(f"{app_url}/health", processes[1])
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.request_timeout) as client:
+            users = await _signup_users(client, args.users, uuid.uuid4().hex[:8])
+
+            seed_seconds = None
+            if args.seed_rows:
+                sys.path.insert(0, SERVER_DIR)
+                from seed import seed_sessions
+                from database import engine
+                try:
+                    seed_seconds = await seed_sessions(
+                        args.seed_rows, [user["id"] for user in users], seed=args.seed, log=None
+                    )
+                finally:
+                    await engine.dispose()
+
+            driver = LoadDriver(client, users, args)
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(
+                driver.worker(index, args.mix, deadline) for index in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - started
+
+            db_pool = (await client.get("/health/db-pool")).json()
+
+        return {
+            "commit": _git_commit(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "config": {
+                "duration_s": args.duration,
+                "concurrency": args.concurrency,
+                "mix": args.mix,
+                "users": args.users,
+                "seed_rows": args.seed_rows,
+                "seed": args.seed,
+                "complete_mode": args.complete_mode,
+                "audio_seconds": args.audio_seconds,
+                "ollama_latency_s": args.ollama_latency,
+                "ollama_tokens_per_second": args.ollama_tokens_per_second,
+                "ollama_parallel": args.ollama_parallel,
+                "vosk_chunk_ms": args.vosk_chunk_ms,
+            },
+            "seed_seconds": round(seed_seconds, 2) if seed_seconds is not None else None,
+            "elapsed_s": round(elapsed, 2),
+            **driver.recorder.report(elapsed),
+            "db_pool": db_pool,
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load benchmark with local Ollama/Vosk stand-ins")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("live=50,list=25,complete=10,login=15"))
+    parser.add_argument("--users", type=int, default=20, help="Accounts to sign up")
+    parser.add_argument("--seed-rows", type=int, default=0, help="Sessions to COPY-load for those accounts")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed for reproducible request streams")
+    parser.add_argument("--complete-mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--audio-seconds", type=float, default=20.0)
+    parser.add_argument("--ollama-latency", type=float, default=0.3)
+    parser.add_argument("--ollama-tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--ollama-parallel", type=int, default=4)
+    parser.add_argument("--vosk-chunk-ms", type=float, default=2.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--ollama-port", type=int, default=11500)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# server-fastapi/bench/seed.py
+"""
+Bulk-load synthetic completed sessions with COPY.
+
+  python server-fastapi/bench/seed.py --rows 2000000 --users 1000
+
+Rows are spread over the given user ids (default bench-user-0..N-1) and the
+last year, with realistic JSONB payload sizes. Uses DATABASE_URL; start the
+API once first so the startup schema upgrade has added any newer columns.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine, Base
+import models  # noqa: F401  (registers tables)
+
+COLUMNS = (
+    "id", "user_id", "topic", "mode", "duration", "created_at",
+    "eye_contact_percentage", "confidence_score", "words_per_minute",
+    "filler_words_count", "posture_score", "posture_data", "transcript",
+    "strengths", "improvements", "eye_contact_data", "is_public",
+    "completed_at", "updated_at",
+)
+TOPICS = ("software engineer", "product manager", "sales", "general", "data analyst")
+POSTURES = ("good", "good", "good", "slouching", "leaning")
+TRANSCRIPT = (
+    "so um I think the main thing is to basically stay calm and you know "
+    "speak clearly about my experience with the team "
+) * 8
+
+
+def _session_record(rng: random.Random, user_id: str, now: datetime) -> tuple:
+    duration = rng.randint(30, 600)
+    created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+    completed_at = created_at + timedelta(seconds=duration)
+    samples = min(duration, 120)
+    eye_contact = [
+        {"timestamp": t, "hasEyeContact": rng.random() < 0.7} for t in range(samples)
+    ]
+    posture = [
+        {"timestamp": t, "posture": rng.choice(POSTURES), "confidence": round(rng.uniform(50, 95), 1)}
+        for t in range(0, samples, 2)
+    ]
+    return (
+        str(uuid.uuid4()),
+        user_id,
+        rng.choice(TOPICS),
+        "practice",
+        duration,
+        created_at,
+        rng.uniform(30, 95),
+        rng.uniform(40, 95),
+        rng.uniform(90, 180),
+        rng.randint(0, 25),
+        rng.uniform(50, 95),
+        json.dumps(posture),
+        TRANSCRIPT,
+        json.dumps(["Clear structure", "Good pacing"]),
+        json.dumps(["Fewer filler words"]),
+        json.dumps(eye_contact),
+        rng.random() < 0.05,
+        completed_at,
+        completed_at,
+    )
+
+
+async def seed_sessions(
+    rows: int,
+    user_ids: List[str],
+    batch_size: int = 20000,
+    seed: int = 0,
+    log: Optional[Callable[[str], None]] = print,
+) -> float:
+    """COPY `rows` sessions into the sessions table; returns elapsed seconds"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    loaded = 0
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        copy_conn = raw.driver_connection
+        while loaded < rows:
+            count = min(batch_size, rows - loaded)
+            records = [_session_record(rng, rng.choice(user_ids), now) for _ in range(count)]
+            await copy_conn.copy_records_to_table("sessions", records=records, columns=COLUMNS)
+            loaded += count
+            if log:
+                log(f"seeded {loaded}/{rows} sessions ({loaded / (time.perf_counter() - started):.0f} rows/s)")
+        await copy_conn.execute("ANALYZE sessions")
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic sessions with COPY")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def _main():
+        try:
+            await seed_sessions(
+                args.rows,
+                [f"bench-user-{i}" for i in range(args.users)],
+                batch_size=args.batch_size,
+                seed=args.seed,
+            )
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_main())
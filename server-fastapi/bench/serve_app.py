@@ -0,0 +1,41 @@
+# server-fastapi/bench/serve_app.py
+"""
+Run create_app() for benchmarks with the stub recognizer installed.
+
+  python server-fastapi/bench/serve_app.py --port 8765 --ollama-host http://127.0.0.1:11500
+
+Uses DATABASE_URL from the environment / .env (point it at a local Postgres).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import stub_vosk
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API with benchmark stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ollama-host", default="http://127.0.0.1:11500")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the environment first
+    stub_vosk.install()
+    os.environ["OLLAMA_HOST"] = args.ollama_host
+    os.environ["VOSK_MODEL_PATH"] = tempfile.mkdtemp(prefix="bench-vosk-")
+
+    import uvicorn
+    from app import create_app
+
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# server-fastapi/bench/stub_vosk.py
+"""
+Stand-in for the vosk package so benchmarks run without a model download.
+
+KaldiRecognizer burns BENCH_VOSK_CHUNK_MS of CPU per audio chunk (roughly
+what a small model costs) and emits a fixed filler-heavy word stream with
+word timings, so the rest of the pipeline does realistic work.
+"""
+
+import json
+import os
+import sys
+import time
+
+CHUNK_COST = float(os.environ.get("BENCH_VOSK_CHUNK_MS", "2")) / 1000
+WORD_SECONDS = 0.4
+RESULT_EVERY_SECONDS = 2.0
+WORDS = (
+    "so um I think the main thing is to basically stay calm and uh "
+    "you know speak clearly about my experience with the team"
+).split()
+
+
+class Model:
+    def __init__(self, path: str):
+        self.path = path
+
+
+class KaldiRecognizer:
+    def __init__(self, model: Model, sample_rate: float):
+        self.sample_rate = sample_rate
+        self.words_enabled = False
+        self.audio_seconds = 0.0
+        self.emitted_until = 0.0
+        self.pending = []
+
+    def SetWords(self, enabled: bool) -> None:
+        self.words_enabled = enabled
+
+    def _burn(self) -> None:
+        deadline = time.perf_counter() + CHUNK_COST
+        while time.perf_counter() < deadline:
+            pass
+
+    def _advance(self, seconds: float) -> None:
+        self.audio_seconds += seconds
+        while self.emitted_until + WORD_SECONDS <= self.audio_seconds:
+            index = int(self.emitted_until / WORD_SECONDS) % len(WORDS)
+            self.pending.append({
+                "word": WORDS[index],
+                "start": round(self.emitted_until, 2),
+                "end": round(self.emitted_until + WORD_SECONDS * 0.8, 2),
+                "conf": 0.9,
+            })
+            self.emitted_until += WORD_SECONDS
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self._burn()
+        before = self.audio_seconds
+        self._advance(len(data) / 2 / self.sample_rate)
+        return int(self.audio_seconds / RESULT_EVERY_SECONDS) > int(before / RESULT_EVERY_SECONDS)
+
+    def _flush(self) -> str:
+        words, self.pending = self.pending, []
+        result = {"text": " ".join(w["word"] for w in words)}
+        if self.words_enabled and words:
+            result["result"] = words
+        return json.dumps(result)
+
+    def Result(self) -> str:
+        return self._flush()
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": " ".join(w["word"] for w in self.pending)})
+
+    def FinalResult(self) -> str:
+        return self._flush()
+
+
+def install() -> None:
+    """Make `import vosk` resolve to this module"""
+    sys.modules["vosk"] = sys.modules[__name__]
@@ -0,0 +1,73 @@
+# server-fastapi/circuit_breaker.py
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger("miral.circuit")
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed     calls go through; `failure_threshold` failures in a row open it
+    open       calls are refused until `reset_timeout` seconds have passed
+    half_open  a single probe call goes through; success closes the circuit,
+               failure re-opens it for another `reset_timeout`
+
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now (claims the probe when half-open)"""
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self.probe_in_flight = False
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("%s circuit closed", self.name)
+        self.state = "closed"
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("%s circuit opened after %d failure(s)", self.name, self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """A probe ended without a verdict (e.g. cancelled): let another one through"""
+        self.probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.failures,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,176 @@
+# server-fastapi/completion_worker.py
+"""
+Workers for asynchronous session completion (POST /complete?mode=async).
+Jobs live in the completion_jobs table, so they survive restarts and can be
+processed on any node that shares the database and the upload directory.
+
+Run standalone with:  python server-fastapi/completion_worker.py
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from typing import List, Optional
+
+from config import settings
+from database import AsyncSessionLocal
+from storage import storage
+from openai_service import TranscriptionQueueFull, start_transcription_pool, shutdown_transcription_pool
+from file_uploads import remove_upload
+from session_pipeline import run_completion_pipeline
+from logging_config import configure_logging, start_log_listener, stop_log_listener
+
+logger = logging.getLogger("miral.jobs")
+
+_embedded_workers: List[asyncio.Task] = []
+_stop_event: Optional[asyncio.Event] = None
+_next_stale_sweep = 0.0
+
+
+async def fail_stale_jobs() -> None:
+    """
+    Fail jobs left running by a worker that died on their last attempt.
+    Runs at most every COMPLETION_JOB_POLL_INTERVAL * 60 seconds per process.
+    """
+    global _next_stale_sweep
+    now = time.monotonic()
+    if now < _next_stale_sweep:
+        return
+    _next_stale_sweep = now + settings.completion_job_poll_interval * 60
+
+    async with AsyncSessionLocal() as db:
+        jobs = await storage.fail_stale_completion_jobs(
+            settings.completion_job_stale_after,
+            settings.completion_job_max_attempts,
+            db
+        )
+    for job in jobs:
+        logger.warning("Completion job %s failed: worker stopped responding", job.id)
+        if job.audio_path:
+            remove_upload(job.audio_path)
+
+
+def _worker_id(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+async def process_next_job(worker_id: str) -> bool:
+    """Claim and run one job; returns False when the queue is empty"""
+    await fail_stale_jobs()
+    async with AsyncSessionLocal() as db:
+        job = await storage.claim_completion_job(
+            worker_id,
+            settings.completion_job_stale_after,
+            settings.completion_job_max_attempts,
+            db
+        )
+    if job is None:
+        return False
+
+    payload = job.payload or {}
+    async with AsyncSessionLocal() as db:
+        try:
+            session = await storage.get_session(job.session_id, db)
+            if not session:
+                raise ValueError('Session not found')
+
+            _, transcription_error = await run_completion_pipeline(
+                session=session,
+                duration=payload.get('duration', 0),
+                eye_contact_data=payload.get('eye_contact_data') or [],
+                posture_data=payload.get('posture_data') or [],
+                db=db,
+                transcription=payload.get('transcription'),
+                audio_path=job.audio_path,
+            )
+            await storage.finish_completion_job(
+                job.id, 'succeeded', db, transcription_error=transcription_error
+            )
+
+        except TranscriptionQueueFull:
+            # Not the job's fault: hand it back without burning an attempt
+            await db.rollback()
+            await storage.finish_completion_job(job.id, 'queued', db, refund_attempt=True)
+            await asyncio.sleep(settings.transcription_retry_after)
+            return True
+
+        except Exception as e:
+            logger.exception("Error processing completion job %s: %s", job.id, e)
+            await db.rollback()
+            retry = job.attempts < settings.completion_job_max_attempts
+            await storage.finish_completion_job(
+                job.id, 'queued' if retry else 'failed', db, error=str(e)
+            )
+            if retry:
+                return True
+
+    if job.audio_path:
+        remove_upload(job.audio_path)
+    return True
+
+
+async def run_worker(worker_id: str, stop_event: asyncio.Event) -> None:
+    """Poll the job queue until stop_event is set"""
+    while not stop_event.is_set():
+        try:
+            if await process_next_job(worker_id):
+                continue
+        except Exception as e:
+            logger.exception("Completion worker %s error: %s", worker_id, e)
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.completion_job_poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_embedded_workers() -> None:
+    """Run COMPLETION_EMBEDDED_WORKERS job workers inside the API process"""
+    global _stop_event
+    if _embedded_workers or settings.completion_embedded_workers <= 0:
+        return
+    _stop_event = asyncio.Event()
+    for index in range(settings.completion_embedded_workers):
+        _embedded_workers.append(
+            asyncio.create_task(run_worker(_worker_id(index), _stop_event))
+        )
+
+
+async def stop_embedded_workers() -> None:
+    """Let embedded workers finish their current job, then stop them"""
+    if _stop_event is not None:
+        _stop_event.set()
+    if _embedded_workers:
+        await asyncio.gather(*_embedded_workers, return_exceptions=True)
+        _embedded_workers.clear()
+
+
+async def main() -> None:
+    configure_logging()
+    start_log_listener()
+    start_transcription_pool()
+    stop_event = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass  # Windows: rely on KeyboardInterrupt
+
+    concurrency = max(1, settings.completion_worker_concurrency)
+    logger.info("Completion worker started with %d job slot(s)", concurrency)
+    try:
+        await asyncio.gather(*(
+            run_worker(_worker_id(index), stop_event) for index in range(concurrency)
+        ))
+    finally:
+        shutdown_transcription_pool()
+        stop_log_listener()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
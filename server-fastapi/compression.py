@@ -0,0 +1,110 @@
+# server-fastapi/compression.py
+"""
+Response compression negotiated from Accept-Encoding: brotli when the
+client accepts it and the brotli package is installed, gzip otherwise.
+Only complete (non-streaming) bodies of at least COMPRESSION_MIN_SIZE bytes
+with a compressible content type are compressed.
+"""
+
+import gzip
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config import settings
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def _accepted_encodings(headers: List[Tuple[bytes, bytes]]) -> List[str]:
+    for name, value in headers:
+        if name == b"accept-encoding":
+            accepted = []
+            for part in value.decode("latin-1").lower().split(","):
+                coding, _, params = part.partition(";")
+                params = params.replace(" ", "")
+                try:
+                    quality = float(params[2:]) if params.startswith("q=") else 1.0
+                except ValueError:
+                    quality = 1.0
+                if quality > 0:
+                    accepted.append(coding.strip())
+            return accepted
+    return []
+
+
+def choose_encoding(headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+    accepted = _accepted_encodings(headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.brotli_quality)
+    return gzip.compress(body, compresslevel=settings.gzip_level)
+
+
+class CompressionMiddleware:
+    """Pure ASGI gzip/brotli middleware (streaming responses pass through)"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(scope["headers"])
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = start_message["headers"]
+            body = message.get("body", b"")
+            start, start_message = start_message, None
+            content_type = next((v for k, v in headers if k == b"content-type"), b"").decode("latin-1")
+            eligible = (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+                and not any(k == b"content-encoding" for k, _ in headers)
+            )
+            if not eligible:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            vary = [v for k, v in headers if k == b"vary"] + [b"Accept-Encoding"]
+            start["headers"] = [
+                (k, v) for k, v in headers if k not in (b"content-length", b"vary")
+            ] + [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b", ".join(vary)),
+            ]
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
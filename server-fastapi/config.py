@@ -11,18 +11,109 @@ ENV_FILE = BASE_DIR / ".env"
 class Settings(BaseSettings):
     # Database
     database_url: str
+    db_pool_size: int = 10  # Persistent connections per worker process
+    db_max_overflow: int = 20  # Extra connections allowed under burst load
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 240  # Seconds before a connection is replaced; keep below the server/pooler idle timeout
+    db_pool_pre_ping: bool = False  # Opt-in ping on every checkout for hosts that drop connections early (e.g. Neon compute suspend)
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection; 0 behind PgBouncer transaction pooling
+    database_replica_urls: str = ""  # Comma-separated read replica URLs for read-only endpoints
+    db_replica_eject_seconds: float = 30.0  # How long a replica stays out of rotation after a connection error
+    db_read_your_writes_seconds: float = 10.0  # After a write, the client's reads use the primary this long; keep above replica lag
     
     # OpenAI
     openai_api_key: Optional[str] = None
     # Local speech-to-text (Vosk)
     vosk_model_path: Optional[str] = None
+    transcription_workers: int = 0  # Vosk processes per server worker; 0 = CPU cores / WORKERS (at least 1)
+    transcription_max_pending: int = 32  # Running + queued jobs before returning 503
+    transcription_timeout: float = 300.0  # Seconds per transcription job
+    transcription_retry_after: int = 10  # Retry-After seconds sent with 503
+    upload_dir: Optional[str] = None  # Defaults to server-fastapi/uploads; must be shared if job workers run on other nodes
+    max_upload_bytes: int = 100 * 1024 * 1024  # Largest accepted recording
+    request_overhead_bytes: int = 16 * 1024 * 1024  # Allowance on top of MAX_UPLOAD_BYTES for the other form fields of a request
+    upload_chunk_size: int = 1024 * 1024  # Bytes per read while streaming uploads to disk
+    streaming_max_sessions: int = 50  # Concurrent WebSocket transcription streams
+    streaming_finished_ttl: float = 600.0  # Seconds a finished stream waits for /complete
+    streaming_recognition_workers: int = 2  # Threads running Vosk for WebSocket streams (separate from the default executor)
+    streaming_stop_wait: float = 3.0  # Seconds /complete waits for a still-open stream's stop before transcribing the upload
+    
+    # Asynchronous session completion jobs
+    completion_embedded_workers: int = 1  # Job workers inside the API process; 0 if only completion_worker.py runs them
+    completion_worker_concurrency: int = 2  # Job slots per standalone completion_worker.py process
+    completion_job_poll_interval: float = 1.0  # Seconds between queue polls when idle
+    completion_job_stale_after: float = 900.0  # Seconds before a running job from a dead worker is reclaimed
+    completion_job_max_attempts: int = 3
+    
+    # Ollama (local LLM feedback)
+    ollama_host: str = "http://localhost:11434"
+    ollama_model: str = "gemma:2b"
+    ollama_max_concurrency: int = 4  # Generations in flight; extra calls wait their turn
+    ollama_max_connections: int = 10  # Pooled keep-alive HTTP connections to Ollama
+    ollama_timeout: float = 120.0  # Seconds per generation request
+    ollama_keep_alive: str = "10m"  # Keep the model (and its prompt cache) loaded between live turns
+    ollama_breaker_failures: int = 5  # Consecutive failures before Ollama is skipped entirely
+    ollama_breaker_reset_seconds: float = 30.0  # Wait before a single recovery probe is let through
+    
+    # Live feedback response cache
+    live_feedback_cache_size: int = 2048
+    live_feedback_cache_ttl: float = 30.0  # Seconds
+    live_feedback_pct_bucket: float = 5.0  # Eye contact / posture bucket width (%)
+    live_feedback_wpm_bucket: float = 10.0
+    live_feedback_filler_bucket: int = 2
+    live_feedback_transcript_tail: int = 300  # Trailing transcript chars hashed into the key
+    live_feedback_deadline: float = 4.0  # Seconds before /api/feedback/live answers with rule-based feedback; 0 = wait
+    live_feedback_finish_in_background: bool = True  # Let late generations finish and warm the cache
+    ollama_background_generations: int = 1  # Late generations kept running at once; capped at OLLAMA_MAX_CONCURRENCY - 1
+    completion_feedback_deadline: float = 60.0  # Same budget for the feedback step of /complete; 0 = wait
+    
+    # Session-scoped live coaching context (Ollama context reuse)
+    live_context_max_sessions: int = 1000
+    live_context_idle_seconds: float = 120.0  # Drop a session's context after this long without a turn
+    live_context_max_turns: int = 30  # Start a fresh conversation after this many turns
+    live_context_max_tokens: int = 1500  # ...or once the context outgrows the model's window
     
     # Server
     port: int = 8000
     host: str = "0.0.0.0"
+    server_mode: str = "development"  # "production": multi-worker gunicorn + uvicorn workers
+    workers: int = 0  # Production worker processes; 0 = one per CPU core. Each runs its own transcription pool
+    backlog: int = 2048  # Pending connections queued by the listening socket
+    keepalive: int = 5  # Seconds to hold idle keep-alive connections
+    graceful_timeout: int = 90  # Seconds to drain in-flight requests (e.g. /complete) on SIGTERM
+    worker_timeout: int = 300  # Seconds before a silent worker is restarted
+    
+    # Session listing (keyset pagination)
+    sessions_page_size: int = 100  # Page size for GET /api/sessions?cursor=... without ?limit=
+    sessions_max_page_size: int = 500
+    
+    # Response compression
+    compression_min_size: int = 1024  # Bytes; smaller bodies are sent uncompressed
+    gzip_level: int = 6
+    brotli_quality: int = 4  # 0-11; low levels are much faster at a small size cost
+    session_cache_max_age: int = 86400  # Seconds browsers may reuse a completed session without revalidating
+    
+    user_stats_trend_length: int = 10  # Recent sessions kept in the per-user stats trend
+    
+    metrics_window_seconds: float = 10.0  # Window width for per-window eye contact / posture rollups
+    metrics_max_chart_points: int = 120  # Downsampled chart series length
+    speech_window_seconds: float = 30.0  # Window width for per-window WPM
+    speech_pause_threshold: float = 0.5  # Gap between words (s) counted as a pause
+    compact_timeseries_storage: bool = True  # Store eye contact / posture series as bytea instead of JSONB
     
     # Security
     session_secret: str = "your-random-secret-key-here"
+    bcrypt_rounds: int = 10  # Existing hashes are upgraded on next login when this changes
+    password_hash_workers: int = 2  # Concurrent bcrypt operations
+    require_auth: bool = False  # Reject requests without a Bearer token instead of trusting userId
+    auth_claims_cache_size: int = 10000  # Verified JWTs kept in memory
+    
+    # Request profiling (pyinstrument); off unless a token or sample rate is set
+    profiling_token: Optional[str] = None  # Requests with X-Profile: <token> are profiled
+    profiling_sample_rate: float = 0.0  # Fraction of all requests profiled (e.g. 0.001)
+    profiling_interval: float = 0.001  # Sampling interval in seconds
+    profile_dir: Optional[str] = None  # Defaults to server-fastapi/profiles
+    profiles_kept: int = 200  # Oldest profiles are deleted beyond this
     
     # CORS - Use string instead of list, we'll parse it manually
     cors_origins: str = "http://localhost:5000"
@@ -37,6 +128,16 @@ class Settings(BaseSettings):
     def get_cors_list(self) -> list:
         """Convert CORS_ORIGINS string to list"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
+    
+    def get_replica_url_list(self) -> list:
+        """Convert DATABASE_REPLICA_URLS string to list"""
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+    
+    def get_server_workers(self) -> int:
+        """Server worker processes: WORKERS in production mode, otherwise 1"""
+        if self.server_mode != "production":
+            return 1
+        return self.workers or os.cpu_count() or 1
 
 settings = Settings()
 
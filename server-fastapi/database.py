@@ -1,68 +1,136 @@
 # server-fastapi/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from fastapi import Request, Response
+from typing import AsyncGenerator, Dict, Any, List, Optional, Tuple
+import itertools
+import logging
+import time
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from config import settings
 
-# Convert postgres:// to postgresql+asyncpg:// and handle sslmode
-DATABASE_URL = settings.database_url
-
-# Parse the URL to extract query parameters
-parsed = urlparse(DATABASE_URL)
-query_params = parse_qs(parsed.query)
-
-# Remove sslmode and other asyncpg-incompatible parameters from query string
-# asyncpg doesn't support these as URL parameters and will cause errors
-sslmode = None
-if 'sslmode' in query_params:
-    sslmode = query_params.pop('sslmode')[0]
-
-# Remove any other parameters that might cause issues with asyncpg
-# (channel_binding, sslcert, sslkey, etc. are handled differently in asyncpg)
-incompatible_params = ['channel_binding', 'sslcert', 'sslkey', 'sslrootcert']
-for param in incompatible_params:
-    if param in query_params:
-        query_params.pop(param)
-
-# Rebuild query string without incompatible parameters
-if query_params:
-    new_query = urlencode(query_params, doseq=True)
-    parsed = parsed._replace(query=new_query)
-else:
-    parsed = parsed._replace(query='')
-
-# Convert postgres:// to postgresql+asyncpg://
-if parsed.scheme == "postgres":
-    parsed = parsed._replace(scheme="postgresql+asyncpg")
-elif parsed.scheme == "postgresql":
-    parsed = parsed._replace(scheme="postgresql+asyncpg")
-
-DATABASE_URL = urlunparse(parsed)
-
-# Configure connect_args for SSL
-# Neon database requires SSL, but asyncpg handles it automatically
-# We should NOT pass ssl parameter directly to avoid "channel_binding" errors
-# asyncpg will negotiate SSL automatically if the server requires it
-connect_args = {}
-# Only explicitly disable SSL if requested
-if sslmode == 'disable':
-    connect_args['ssl'] = False
-# For all other cases (including Neon), let asyncpg handle SSL automatically
-# Don't set ssl=True as it can cause "channel_binding" parameter errors
+logger = logging.getLogger("miral.database")
+
+def _prepare_url(url: str) -> Tuple[str, Dict[str, Any]]:
+    """Convert postgres:// to postgresql+asyncpg:// and handle sslmode"""
+    # Parse the URL to extract query parameters
+    parsed = urlparse(url)
+    query_params = parse_qs(parsed.query)
+
+    # Remove sslmode and other asyncpg-incompatible parameters from query string
+    # asyncpg doesn't support these as URL parameters and will cause errors
+    sslmode = None
+    if 'sslmode' in query_params:
+        sslmode = query_params.pop('sslmode')[0]
+
+    # Remove any other parameters that might cause issues with asyncpg
+    # (channel_binding, sslcert, sslkey, etc. are handled differently in asyncpg)
+    incompatible_params = ['channel_binding', 'sslcert', 'sslkey', 'sslrootcert']
+    for param in incompatible_params:
+        if param in query_params:
+            query_params.pop(param)
+
+    # Prepared statement cache of SQLAlchemy's asyncpg dialect
+    query_params['prepared_statement_cache_size'] = [str(settings.db_statement_cache_size)]
+
+    # Rebuild query string without incompatible parameters
+    if query_params:
+        new_query = urlencode(query_params, doseq=True)
+        parsed = parsed._replace(query=new_query)
+    else:
+        parsed = parsed._replace(query='')
+
+    # Convert postgres:// to postgresql+asyncpg://
+    if parsed.scheme == "postgres":
+        parsed = parsed._replace(scheme="postgresql+asyncpg")
+    elif parsed.scheme == "postgresql":
+        parsed = parsed._replace(scheme="postgresql+asyncpg")
+
+    url = urlunparse(parsed)
+
+    # Configure connect_args for SSL
+    # Neon database requires SSL, but asyncpg handles it automatically
+    # We should NOT pass ssl parameter directly to avoid "channel_binding" errors
+    # asyncpg will negotiate SSL automatically if the server requires it
+    connect_args = {
+        # asyncpg's own statement cache (must be 0 behind PgBouncer transaction pooling)
+        'statement_cache_size': settings.db_statement_cache_size,
+    }
+    # Only explicitly disable SSL if requested
+    if sslmode == 'disable':
+        connect_args['ssl'] = False
+    # For all other cases (including Neon), let asyncpg handle SSL automatically
+    # Don't set ssl=True as it can cause "channel_binding" parameter errors
+
+    return url, connect_args
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
 
 # Create async engine
 # For Neon: asyncpg will automatically use SSL when the server requires it
 # We only pass connect_args if we need to explicitly disable SSL
-engine_kwargs = {
-    "echo": False,  # Set to True for SQL query logging
-    "future": True,
-    "pool_pre_ping": True,
-}
-if connect_args:
-    engine_kwargs["connect_args"] = connect_args
+def _create_engine(url: str) -> AsyncEngine:
+    url, connect_args = _prepare_url(url)
+    engine_kwargs = {
+        "echo": False,  # Set to True for SQL query logging
+        "future": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        # Staleness without a round trip per checkout: a connection never outlives
+        # pool_recycle, which is kept below the server's idle timeout (a connection's
+        # age bounds its idle time), and a disconnect error invalidates the whole pool
+        # so the other connections from the same outage are replaced too. Pre-ping is
+        # opt-in for hosts that drop connections early, e.g. when Neon suspends compute
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        # Most recently used first: surplus connections idle out instead of going stale in rotation
+        "pool_use_lifo": True,
+    }
+    if connect_args:
+        engine_kwargs["connect_args"] = connect_args
+    return create_async_engine(url, **engine_kwargs)
 
-engine = create_async_engine(DATABASE_URL, **engine_kwargs)
+engine = _create_engine(settings.database_url)
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -75,6 +143,77 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+class ReadReplica:
+    """One read replica; taken out of rotation for a while after connection errors"""
+    
+    def __init__(self, url: str):
+        self.engine = _create_engine(url)
+        self.sessionmaker = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+        self.host = urlparse(url).hostname or "unknown"
+        self.ejected_until = 0.0
+        self.ejections = 0
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+    
+    def _on_error(self, context) -> None:
+        # Connect failures and dropped connections mean the replica is unhealthy;
+        # ordinary SQL errors do not
+        if context.is_disconnect or context.connection is None:
+            self.eject()
+    
+    def eject(self) -> None:
+        self.ejected_until = time.monotonic() + settings.db_replica_eject_seconds
+        self.ejections += 1
+        logger.warning("Read replica %s ejected for %.0fs", self.host, settings.db_replica_eject_seconds)
+    
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+replicas: List[ReadReplica] = [ReadReplica(url) for url in settings.get_replica_url_list()]
+_replica_rotation = itertools.count()
+
+def _next_replica() -> Optional[ReadReplica]:
+    """Round-robin over healthy replicas; None means use the primary"""
+    if not replicas:
+        return None
+    start = next(_replica_rotation)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.healthy:
+            return replica
+    return None
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """True when db reads from a replica (and may lag behind the primary)"""
+    return db.bind is not engine
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Live connection pool statistics for this worker process"""
+    stats = engine.sync_engine.pool.stats()
+    if replicas:
+        stats["replicas"] = [
+            {
+                "host": replica.host,
+                "healthy": replica.healthy,
+                "ejections": replica.ejections,
+                **replica.engine.sync_engine.pool.stats(),
+            }
+            for replica in replicas
+        ]
+    return stats
+
+async def dispose_engines() -> None:
+    """Close pooled connections of the primary and all replicas"""
+    for replica in replicas:
+        await replica.engine.dispose()
+    await engine.dispose()
+
 # Dependency for routes
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -82,3 +221,33 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+# Cookie marking a client that wrote recently; its reads go to the primary
+PRIMARY_PIN_COOKIE = "miral_read_primary"
+
+def pin_reads_to_primary(response: Response) -> None:
+    """
+    Call from write endpoints: for DB_READ_YOUR_WRITES_SECONDS the client's
+    get_read_db reads use the primary, so a lagging replica cannot hide the
+    write. A cookie works across worker processes and nodes.
+    """
+    if not replicas or settings.db_read_your_writes_seconds <= 0:
+        return
+    response.set_cookie(
+        PRIMARY_PIN_COOKIE,
+        "1",
+        max_age=max(1, int(settings.db_read_your_writes_seconds)),
+        httponly=True,
+        samesite="lax",
+    )
+
+# Dependency for read-only routes: a healthy replica when configured, else the primary.
+# Never use it for writes; write endpoints call pin_reads_to_primary for their caller.
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    replica = None if PRIMARY_PIN_COOKIE in request.cookies else _next_replica()
+    sessionmaker = replica.sessionmaker if replica else AsyncSessionLocal
+    async with sessionmaker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
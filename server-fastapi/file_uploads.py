@@ -0,0 +1,154 @@
+# server-fastapi/file_uploads.py
+import json
+import logging
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from config import settings
+from metrics import stage_timer
+
+logger = logging.getLogger("miral.uploads")
+
+UPLOAD_DIR = Path(settings.upload_dir) if settings.upload_dir else Path(__file__).resolve().parent / "uploads"
+
+
+class RequestTooLarge(Exception):
+    """Raised from receive() once a request body passes the size limit"""
+
+
+def max_request_bytes() -> int:
+    """Largest accepted request body: one recording plus the other form fields"""
+    return settings.max_upload_bytes + settings.request_overhead_bytes
+
+
+async def _send_too_large(send) -> None:
+    body = json.dumps({
+        "detail": f'Upload exceeds {settings.max_upload_bytes // (1024 * 1024)} MB limit'
+    }).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RequestSizeLimitMiddleware:
+    """
+    Rejects oversized request bodies before they are spooled (pure ASGI).
+    FastAPI parses multipart forms, writing file parts to temporary files,
+    before the endpoint runs, so save_upload alone would only see an
+    oversized recording after it was fully received. Here a too-large
+    Content-Length is refused up front and a body without one is cut off
+    while it streams in.
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes if self.max_bytes is not None else max_request_bytes()
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > limit
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    await _send_too_large(send)
+                    return
+                break
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise RequestTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded and not response_started:
+                return  # Drop the app's error response; 413 is sent below
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RequestTooLarge:
+            pass
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await _send_too_large(send)
+
+
+def _safe_suffix(filename: str) -> str:
+    """Keep a short alphanumeric extension from the client filename, nothing else"""
+    suffix = Path(filename or "").suffix.lower()
+    return suffix if re.fullmatch(r"\.[a-z0-9]{1,10}", suffix) else ""
+
+
+async def save_upload(upload: UploadFile) -> str:
+    """
+    Stream an upload to disk in fixed-size chunks under a unique
+    server-generated name. Raises 413 once MAX_UPLOAD_BYTES is exceeded;
+    partially written files are always removed on failure.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = str(UPLOAD_DIR / f"{uuid.uuid4().hex}{_safe_suffix(upload.filename)}")
+
+    written = 0
+    try:
+        with stage_timer("upload_write"):
+            async with aiofiles.open(path, 'wb') as f:
+                while True:
+                    chunk = await upload.read(settings.upload_chunk_size)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > settings.max_upload_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f'Upload exceeds {settings.max_upload_bytes // (1024 * 1024)} MB limit'
+                        )
+                    await f.write(chunk)
+    except BaseException:
+        remove_upload(path)
+        raise
+
+    return path
+
+
+def remove_upload(path: str) -> None:
+    """Delete a saved upload, ignoring files that are already gone"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Error removing upload %s: %s", path, e)
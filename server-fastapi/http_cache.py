@@ -0,0 +1,59 @@
+# server-fastapi/http_cache.py
+"""
+Conditional GET support for session resources.
+
+A session's version is its updated_at (falling back to completed_at and
+created_at for rows written before updated_at existed). The ETag of a
+single session or a list page is a digest of (id, version) pairs, so it can
+be computed, and a 304 returned, without serializing the body. It is weak:
+it names the representation, not its bytes, which differ between the gzip,
+br and identity encodings chosen by CompressionMiddleware.
+"""
+
+import hashlib
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+from config import settings
+
+
+def session_version(session: Any) -> str:
+    version = (
+        getattr(session, "updated_at", None)
+        or getattr(session, "completed_at", None)
+        or getattr(session, "created_at", None)
+    )
+    return version.isoformat() if version else ""
+
+
+def sessions_etag(sessions: Iterable[Any], *extra: Optional[str]) -> str:
+    """Weak ETag for one or more sessions (plus e.g. the next-page cursor)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for session in sessions:
+        digest.update(f"{session.id}@{session_version(session)}\n".encode("utf-8"))
+    for value in extra:
+        digest.update(f"{value or ''}\n".encode("utf-8"))
+    return f'W/"{digest.hexdigest()}"'
+
+
+def session_cache_control(session: Any) -> str:
+    """Completed sessions are effectively immutable; in-progress ones always revalidate"""
+    if getattr(session, "completed_at", None):
+        return f"private, max-age={settings.session_cache_max_age}"
+    return "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return opaque in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,64 @@
+# server-fastapi/logging_config.py
+"""
+Non-blocking logging: handlers on the request path only enqueue records;
+a QueueListener thread formats and writes them to stderr.
+"""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s [%(name)s] %(levelname)s %(message)s"
+DATE_FORMAT = "%I:%M:%S %p"
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Route the app's loggers through the queue (idempotent)"""
+    root = logging.getLogger("miral")
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    root.setLevel(level)
+    root.addHandler(QueueHandler(_queue))
+    root.propagate = False
+
+
+def configure_process_logging(level: int = logging.INFO) -> None:
+    """
+    Pool processes have no listener thread (a forked QueueHandler would only
+    fill a dead queue) and no event loop to protect: write directly.
+    """
+    root = logging.getLogger("miral")
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    root.setLevel(level)
+    root.addHandler(handler)
+    root.propagate = False
+
+
+def start_log_listener() -> None:
+    """
+    Start the writer thread. Called per worker process at startup, since
+    threads do not survive the fork of a preloading server.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    _listener = QueueListener(_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,4 +1,5 @@
 # server-fastapi/main.py
+import sys
 import uvicorn
 from app import create_app
 from config import settings
@@ -6,15 +7,110 @@ from config import settings
 # Create app instance
 app = create_app()
 
+
+def _preload() -> None:
+    """
+    Load heavy shared state once in the master so forked workers share it
+    copy-on-write instead of each loading their own copy
+    """
+    from openai_service import _get_vosk_model
+    try:
+        _get_vosk_model()
+        print("✅ Vosk model preloaded")
+    except Exception as e:
+        print(f"⚠️  Vosk model not preloaded: {e}")
+
+
+def run_production() -> None:
+    """
+    Multi-worker server: gunicorn master with uvicorn workers on uvloop/httptools.
+    The app is imported (preloaded) before fork; SIGTERM lets each worker finish
+    in-flight requests for up to GRACEFUL_TIMEOUT seconds before exiting.
+    Falls back to uvicorn's own multi-process mode where gunicorn is unavailable
+    (Windows), without preload.
+    """
+    import os
+    # Workers size their transcription pools from this (see _get_worker_count);
+    # the environment variable reaches workers spawned instead of forked
+    settings.server_mode = "production"
+    os.environ["SERVER_MODE"] = "production"
+    workers = settings.get_server_workers()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+        from uvicorn.workers import UvicornWorker
+    except ImportError:
+        print("⚠️  gunicorn not installed, using uvicorn workers without preload")
+        uvicorn.run(
+            "main:app",
+            host=settings.host,
+            port=settings.port,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            backlog=settings.backlog,
+            timeout_keep_alive=settings.keepalive,
+            timeout_graceful_shutdown=settings.graceful_timeout,
+            log_level="info"
+        )
+        return
+
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "auto"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "auto"
+
+    class ProductionUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {
+            "loop": loop,
+            "http": http,
+            "timeout_keep_alive": settings.keepalive,
+            "timeout_graceful_shutdown": settings.graceful_timeout,
+        }
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{settings.host}:{settings.port}",
+                "workers": workers,
+                "worker_class": ProductionUvicornWorker,
+                "preload_app": True,
+                "backlog": settings.backlog,
+                "keepalive": settings.keepalive,
+                "graceful_timeout": settings.graceful_timeout,
+                "timeout": settings.worker_timeout,
+                "loglevel": "info",
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            _preload()
+            return app
+
+    print(f"✅ Starting production server: {workers} workers, loop={loop}, http={http}")
+    ProductionApplication().run()
+
+
 if __name__ == "__main__":
     """
     Run FastAPI server
     Matches: server/index-dev.ts behavior
+    Pass --production (or set SERVER_MODE=production) for the multi-worker server.
     """
-    uvicorn.run(
-        "main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=True,  # Auto-reload on code changes (development)
-        log_level="info"
-    )
+    if "--production" in sys.argv or settings.server_mode == "production":
+        run_production()
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=True,  # Auto-reload on code changes (development)
+            log_level="info"
+        )
@@ -0,0 +1,177 @@
+# server-fastapi/metrics.py
+"""
+In-process latency histograms exposed in Prometheus text format on /metrics.
+
+  http_request_duration_seconds{method, route, status}   every HTTP request
+  pipeline_stage_duration_seconds{stage}                  named pipeline stages
+
+Routes are labelled by their template (/api/sessions/{session_id}), never
+the raw path, so label cardinality stays bounded. Each worker process keeps
+its own registry; with several workers, scrape them individually or
+aggregate in Prometheus.
+"""
+
+import bisect
+import logging
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger("miral.metrics")
+access_logger = logging.getLogger("miral.access")
+
+# Seconds; covers fast JSON endpoints up to multi-minute transcriptions
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by a tuple of label values.
+    Not thread-safe: observe from the event loop only.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, label_values: Tuple[str, ...], seconds: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, seconds)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ("method", "route", "status"),
+)
+
+pipeline_stage_duration = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Duration of named session-processing stages",
+    ("stage",),
+)
+
+# name -> (documentation, callback returning {label value: number}); evaluated per scrape
+_gauges: Dict[str, Tuple[str, str, Callable[[], Dict[str, float]]]] = {}
+
+
+def register_gauge(name: str, documentation: str, label_name: str, collect: Callable[[], Dict[str, float]]) -> None:
+    """Expose values computed at scrape time (pool sizes, queue depths, ...)"""
+    _gauges[name] = (documentation, label_name, collect)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    pipeline_stage_duration.observe((stage,), seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a block (sync or containing awaits) as a pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = http_request_duration.render() + pipeline_stage_duration.render()
+    for name, (documentation, label_name, collect) in sorted(_gauges.items()):
+        try:
+            values = collect()
+        except Exception as e:
+            logger.warning("Error collecting gauge %s: %s", name, e)
+            continue
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for label_value, value in sorted(values.items()):
+            lines.append(f"{name}{_format_labels((label_name,), (label_value,))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording http_request_duration_seconds and
+    writing one access log line per /api request.
+    Unlike BaseHTTPMiddleware it does not wrap the response body in an extra
+    task/stream, so streaming and WebSocket traffic pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            elapsed = time.perf_counter() - start
+            http_request_duration.observe((scope["method"], template, str(status_code)), elapsed)
+            if scope["path"].startswith("/api"):
+                access_logger.info(
+                    "%s %s %s in %dms", scope["method"], scope["path"], status_code, elapsed * 1000
+                )
@@ -1,8 +1,9 @@
 # server-fastapi/models.py
-from sqlalchemy import Column, String, Integer, Float, Text, TIMESTAMP, Boolean
+from sqlalchemy import Column, String, Integer, Float, Text, TIMESTAMP, Boolean, Index, Date, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 from database import Base
+from timeseries_codec import decode_eye_contact, decode_posture
 import uuid
 
 class User(Base):
@@ -35,3 +36,77 @@ class Session(Base):
     improvements = Column(JSONB, nullable=False, default=list)
     eye_contact_data = Column(JSONB, nullable=False, default=list)  # Match eyeContactData
     is_public = Column(Boolean, default=False)
+    completed_at = Column(TIMESTAMP, nullable=True)  # Set once, on first completion
+    updated_at = Column(TIMESTAMP, nullable=True, onupdate=func.now())  # Version for ETags (see http_cache)
+    eye_contact_blob = Column(LargeBinary, nullable=True)  # Compact eye_contact_data (see timeseries_codec)
+    posture_blob = Column(LargeBinary, nullable=True)  # Compact posture_data
+    analytics = Column(JSONB, nullable=True)  # Windowed / downsampled series from session_metrics
+    
+    @property
+    def eye_contact_series(self) -> list:
+        """Eye contact samples in JSON shape, whichever way they are stored"""
+        if self.eye_contact_blob:
+            return decode_eye_contact(self.eye_contact_blob)
+        return self.eye_contact_data or []
+    
+    @property
+    def posture_series(self) -> list:
+        """Posture samples in JSON shape, whichever way they are stored"""
+        if self.posture_blob:
+            return decode_posture(self.posture_blob)
+        return self.posture_data or []
+    
+    __table_args__ = (
+        # Keyset pagination of a user's history: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_sessions_user_id_created_at_id", "user_id", created_at.desc(), id.desc()),
+        Index("ix_sessions_created_at_id", created_at.desc(), id.desc()),
+    )
+
+class CompletionJob(Base):
+    """Queued session completion, claimed by workers with FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "completion_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False, default='queued')  # queued | running | succeeded | failed
+    payload = Column(JSONB, nullable=False, default=dict)  # duration, eye contact / posture data, streamed transcript
+    audio_path = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    transcription_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_completion_jobs_status_created_at", "status", "created_at"),
+    )
+
+class UserStats(Base):
+    """Per-user rollup, updated in the same transaction as each session completion"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(String, primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0)
+    confidence_min = Column(Float, nullable=True)
+    confidence_max = Column(Float, nullable=True)
+    eye_contact_sum = Column(Float, nullable=False, default=0)
+    eye_contact_min = Column(Float, nullable=True)
+    eye_contact_max = Column(Float, nullable=True)
+    wpm_sum = Column(Float, nullable=False, default=0)
+    wpm_min = Column(Float, nullable=True)
+    wpm_max = Column(Float, nullable=True)
+    filler_sum = Column(Integer, nullable=False, default=0)
+    filler_min = Column(Integer, nullable=True)
+    filler_max = Column(Integer, nullable=True)
+    posture_sum = Column(Float, nullable=False, default=0)
+    posture_min = Column(Float, nullable=True)
+    posture_max = Column(Float, nullable=True)
+    current_streak_days = Column(Integer, nullable=False, default=0)
+    best_streak_days = Column(Integer, nullable=False, default=0)
+    last_practice_date = Column(Date, nullable=True)
+    recent_sessions = Column(JSONB, nullable=False, default=list)  # Last N {sessionId, createdAt, confidenceScore}
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
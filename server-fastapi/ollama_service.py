@@ -1,8 +1,351 @@
 # server-fastapi/ollama_service.py
-import ollama
-from typing import Dict, List
+import asyncio
+import hashlib
+import logging
+import httpx
+from ollama import AsyncClient
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 import json
-import os
+
+from config import settings
+from cache import TTLCache
+from circuit_breaker import CircuitBreaker, CircuitOpen
+from metrics import stage_timer
+
+logger = logging.getLogger("miral.ollama")
+
+# Shared async client: keeps pooled keep-alive connections to the Ollama server
+_client: Optional[AsyncClient] = None
+# Caps concurrent generations; callers beyond the limit queue on the semaphore
+_generation_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_client() -> AsyncClient:
+    """Lazily create the shared Ollama client"""
+    global _client
+    if _client is None:
+        _client = AsyncClient(
+            host=settings.ollama_host,
+            timeout=settings.ollama_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.ollama_max_connections,
+                max_keepalive_connections=settings.ollama_max_connections,
+            ),
+        )
+    return _client
+
+
+def _get_generation_slots() -> asyncio.Semaphore:
+    """Lazily create the generation semaphore"""
+    global _generation_slots
+    if _generation_slots is None:
+        _generation_slots = asyncio.Semaphore(max(1, settings.ollama_max_concurrency))
+    return _generation_slots
+
+
+# Skips Ollama after repeated failures; probes for recovery (see circuit_breaker)
+ollama_breaker = CircuitBreaker(
+    "Ollama",
+    failure_threshold=settings.ollama_breaker_failures,
+    reset_timeout=settings.ollama_breaker_reset_seconds,
+)
+
+# Generations that missed their deadline but were left running to warm the cache
+_background_generations: Set[asyncio.Task] = set()
+
+
+# Live feedback responses keyed on quantized metrics (see live_feedback_cache_key)
+live_feedback_cache = TTLCache(
+    maxsize=settings.live_feedback_cache_size,
+    ttl=settings.live_feedback_cache_ttl,
+)
+
+
+def _bucket(value: Optional[float], width: float) -> int:
+    """Quantize a metric so small jitter maps to the same bucket"""
+    if not value or width <= 0:
+        return 0
+    return int(value // width)
+
+
+def live_feedback_cache_key(
+    eye_contact_pct: float,
+    posture_score: float,
+    wpm: float,
+    filler_count: int,
+    topic: Optional[str],
+    transcript: Optional[str],
+    face_position: Optional[str] = None,
+    head_tilt: Optional[str] = None,
+    is_in_frame: Optional[bool] = True,
+    session_id: Optional[str] = None,
+) -> tuple:
+    """
+    Build a cache key that only changes when the coaching situation does:
+    bucketed metrics, normalized topic and a digest of the transcript tail.
+    Answers from a session's conversation are keyed to that session.
+    """
+    tail = " ".join((transcript or "").lower().split())
+    tail = tail[-settings.live_feedback_transcript_tail:]
+    transcript_digest = hashlib.blake2b(tail.encode("utf-8"), digest_size=8).hexdigest()
+
+    return (
+        _bucket(eye_contact_pct, settings.live_feedback_pct_bucket),
+        _bucket(posture_score, settings.live_feedback_pct_bucket),
+        _bucket(wpm, settings.live_feedback_wpm_bucket),
+        _bucket(filler_count, settings.live_feedback_filler_bucket),
+        face_position or "center",
+        head_tilt or "straight",
+        bool(is_in_frame) if is_in_frame is not None else True,
+        " ".join((topic or "general").lower().split()),
+        transcript_digest,
+        session_id or "",
+    )
+
+
+async def close_client() -> None:
+    """Close pooled connections to Ollama (called on app shutdown)"""
+    global _client
+    for task in list(_background_generations):
+        task.cancel()
+    if _client is not None:
+        await _client._client.aclose()
+        _client = None
+
+
+async def _call_ollama(request: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run one Ollama request through the circuit breaker and the generation
+    slots. Raises CircuitOpen without calling Ollama while the circuit is open.
+    """
+    if not ollama_breaker.allow():
+        raise CircuitOpen("Ollama is unavailable (circuit open)")
+    try:
+        async with _get_generation_slots():
+            with stage_timer("ollama_generation"):
+                response = await request()
+    except asyncio.CancelledError:
+        ollama_breaker.release_probe()
+        raise
+    except Exception:
+        ollama_breaker.record_failure()
+        raise
+    ollama_breaker.record_success()
+    return response
+
+
+async def _chat(messages: List[Dict[str, str]], **kwargs) -> dict:
+    """
+    Run one chat generation without blocking the event loop.
+    Waits for a free generation slot when the concurrency limit is reached.
+    """
+    return await _call_ollama(lambda: _get_client().chat(
+        model=settings.ollama_model,
+        messages=messages,
+        **kwargs
+    ))
+
+async def _generate(prompt: str, **kwargs) -> dict:
+    """
+    Single-prompt generation (/api/generate), which accepts the context of
+    the previous turn so Ollama can reuse its KV cache for the shared prefix.
+    """
+    return await _call_ollama(lambda: _get_client().generate(
+        model=settings.ollama_model,
+        prompt=prompt,
+        keep_alive=settings.ollama_keep_alive,
+        **kwargs
+    ))
+
+
+def _deliver_late(on_late: Callable[[dict], None], task: asyncio.Task) -> None:
+    _background_generations.discard(task)
+    if task.cancelled() or task.exception() is not None:
+        return
+    try:
+        on_late(task.result())
+    except Exception as e:
+        logger.exception("Error handling late Ollama result: %s", e)
+
+
+async def within_deadline(
+    generation: Awaitable[dict],
+    deadline: float,
+    fallback: Callable[[], dict],
+    on_late: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Await a feedback generation for at most `deadline` seconds (0 = no limit).
+    On a miss, return fallback() immediately; with on_late, the generation
+    keeps running in the background and its result is handed to on_late,
+    e.g. to warm a cache. A miss is not an Ollama failure by itself: the
+    deadline includes waiting for a generation slot, so a busy local queue
+    must not open the circuit. Failures are counted once, by _call_ollama,
+    when the request itself errors or hits ollama_timeout.
+    """
+    if deadline <= 0:
+        return await generation
+
+    task = asyncio.ensure_future(generation)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=deadline)
+    except asyncio.TimeoutError:
+        # Background generations hold generation slots; leave at least one
+        # free so new calls are not starved into falling back
+        background_limit = min(
+            settings.ollama_background_generations,
+            settings.ollama_max_concurrency - 1,
+        )
+        if (
+            on_late is not None
+            and settings.live_feedback_finish_in_background
+            and len(_background_generations) < background_limit
+        ):
+            _background_generations.add(task)
+            task.add_done_callback(lambda done: _deliver_late(on_late, done))
+        else:
+            task.cancel()
+        return fallback()
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+LIVE_COACH_SYSTEM_PROMPT = """You are an expert interview coach giving LIVE coaching during a {role} practice interview.
+You receive an update every few seconds with the current metrics (and how they changed
+since the previous update), the user's on-camera situation and any NEW transcript text.
+
+For every update:
+- Base your feedback on what is happening RIGHT NOW; react to the changes
+- If eye contact is low, focus on that; if posture is poor, address it
+- If the user is out of frame or mispositioned, mention it
+- Vary your language; do not repeat earlier feedback word for word
+- Be encouraging but direct about what needs improvement
+
+Reply with this EXACT JSON format ONLY:
+{{
+  "strengths": ["2-3 specific things they're doing well RIGHT NOW"],
+  "improvements": ["2-3 specific actions to take RIGHT NOW based on current metrics"],
+  "confidence_score": <number 0-100 based on current performance>,
+  "role_specific_tips": ["1-2 tips specific to {role} interviews"],
+  "summary": "1-2 sentence summary of current performance state"
+}}"""
+
+# (label, key, format) of the metrics reported on each live turn
+LIVE_COACH_METRICS = (
+    ("Eye Contact", "eye_contact_pct", "{:.1f}%"),
+    ("Posture Score", "posture_score", "{:.1f}%"),
+    ("Speaking Rate", "wpm", "{:.1f} WPM"),
+    ("Filler Words", "filler_count", "{:d}"),
+)
+
+
+class LiveCoachState:
+    """Conversation state of one practice session"""
+
+    __slots__ = ("role", "context", "turns", "metrics", "transcript_chars", "situation")
+
+    def __init__(self, role: str):
+        self.role = role
+        self.context: List[int] = []  # Token context returned by the previous turn
+        self.turns = 0
+        self.metrics: Dict[str, float] = {}
+        self.transcript_chars = 0  # Transcript already sent
+        self.situation = ""
+
+
+# Session id -> LiveCoachState; idle sessions expire, completed ones are dropped
+live_coach_sessions = TTLCache(
+    maxsize=settings.live_context_max_sessions,
+    ttl=settings.live_context_idle_seconds,
+)
+
+
+def end_live_session(session_id: str) -> None:
+    """Forget a session's coaching conversation (on completion)"""
+    live_coach_sessions.pop(session_id)
+
+
+def _live_turn_prompt(state: LiveCoachState, metrics: Dict[str, float], duration: int, transcript: str, situation: str) -> str:
+    """Only what changed since the previous turn: metrics, situation, new transcript"""
+    lines = [f"UPDATE {state.turns + 1} at {duration}s ({duration // 60}m {duration % 60}s):"]
+    for label, key, fmt in LIVE_COACH_METRICS:
+        line = f"- {label}: {fmt.format(metrics[key])}"
+        previous = state.metrics.get(key)
+        if previous is not None and previous != metrics[key]:
+            line += f" (was {fmt.format(previous)})"
+        lines.append(line)
+
+    if situation and situation != state.situation:
+        lines.append(f"- Situation: {situation}")
+
+    # A shorter transcript means a restarted stream: resend its tail
+    new_text = transcript[state.transcript_chars:] if len(transcript) >= state.transcript_chars else transcript
+    new_text = new_text.strip()[-2000:]
+    lines.append(f"NEW TRANSCRIPT: {new_text}" if new_text else "NEW TRANSCRIPT: (nothing new)")
+    return "\n".join(lines)
+
+
+async def generate_session_feedback(
+    session_id: str,
+    eye_contact_pct: float,
+    posture_score: float,
+    wpm: float,
+    filler_count: int,
+    duration: int,
+    transcript: str = "",
+    role: str = "general",
+    context: str = ""
+) -> Dict[str, List[str]]:
+    """
+    Live feedback as one continuing conversation per practice session.
+    The coaching instructions are sent once as the system prompt; later
+    turns pass Ollama the previous context and only the metric changes and
+    new transcript text, so the shared prefix is not re-processed.
+    """
+    metrics = {
+        "eye_contact_pct": float(eye_contact_pct or 0),
+        "posture_score": float(posture_score or 0),
+        "wpm": float(wpm or 0),
+        "filler_count": int(filler_count or 0),
+    }
+    state = live_coach_sessions.get(session_id)
+    if (
+        state is None
+        or state.role != role
+        or state.turns >= settings.live_context_max_turns
+        or len(state.context) > settings.live_context_max_tokens
+    ):
+        state = LiveCoachState(role)
+
+    prompt = _live_turn_prompt(state, metrics, duration, transcript, context)
+    try:
+        if state.context:
+            # The system prompt is already part of the context
+            conversation = {'context': state.context}
+        else:
+            conversation = {'system': LIVE_COACH_SYSTEM_PROMPT.format(role=role)}
+        response = await _generate(
+            prompt,
+            format="json",
+            options={'temperature': 0.7, 'top_p': 0.9, 'num_predict': 500},
+            **conversation
+        )
+        feedback = json.loads(response['response'])
+    except Exception as e:
+        logger.warning("Ollama error: %s", e)
+        # Start over next turn rather than build on a broken conversation
+        end_live_session(session_id)
+        return generate_fallback_feedback(eye_contact_pct, posture_score, wpm, filler_count)
+
+    state.context = list(response.get('context') or [])
+    state.turns += 1
+    state.metrics = metrics
+    state.transcript_chars = len(transcript)
+    state.situation = context
+    live_coach_sessions.set(session_id, state)
+    return feedback
+
 
 async def generate_feedback(
     eye_contact_pct: float,
@@ -57,8 +400,7 @@ Be dynamic - if metrics changed, reflect that change in your feedback.
 """
         
         # Call Ollama Gemma:2b (local model via Ollama)
-        response = ollama.chat(
-            model='gemma:2b',
+        response = await _chat(
             messages=[{'role': 'user', 'content': prompt}],
             options={
                 'temperature': 0.7,
@@ -78,11 +420,12 @@ Be dynamic - if metrics changed, reflect that change in your feedback.
                 "improvements": ["Keep practicing regularly"],
                 "confidence_score": max(50, min(90, (eye_contact_pct + posture_score + (wpm/2)) / 3)),
                 "role_specific_tips": ["Practice consistently"],
-                "summary": "Solid practice session - keep improving!"
+                "summary": "Solid practice session - keep improving!",
+                "fallback": True
             }
     
     except Exception as e:
-        print(f"Ollama error: {e}")
+        logger.warning("Ollama error: %s", e)
         # Fallback to rule-based feedback
         return generate_fallback_feedback(eye_contact_pct, posture_score, wpm, filler_count)
 
@@ -118,5 +461,6 @@ def generate_fallback_feedback(
         "improvements": improvements[:3],
         "confidence_score": max(0, min(100, (eye_contact_pct * 0.4 + posture_score * 0.3 + (150-wpm)*0.1))),
         "role_specific_tips": ["Practice with a mirror", "Record and review sessions"],
-        "summary": "Good practice session - focus on key improvements"
+        "summary": "Good practice session - focus on key improvements",
+        "fallback": True  # Not from the model: never cached
     }
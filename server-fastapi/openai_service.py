@@ -6,15 +6,26 @@ used by routes.py.
 
 import asyncio
 import json
+import logging
+import multiprocessing
 import os
 import subprocess
-import tempfile
+import time
 import wave
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
 
 from vosk import Model, KaldiRecognizer
   
 from config import settings
+from metrics import observe_stage
+from logging_config import configure_process_logging
+
+logger = logging.getLogger("miral.transcription")
+
+SAMPLE_RATE = 16000
+PCM_CHUNK_FRAMES = 4000  # 16-bit mono frames per recognizer call
+TIMEOUT_GRACE_SECONDS = 10.0  # Extra wait for a worker to notice its deadline
 
 _vosk_model: Optional[Model] = None
 
@@ -38,42 +49,224 @@ def _get_vosk_model() -> Model:
     return _vosk_model
 
 
+class TranscriptionQueueFull(Exception):
+    """Raised when too many transcription jobs are already pending"""
+
+
+class TranscriptionTimeout(Exception):
+    """Raised inside a worker once a job passes its deadline"""
+
+
+# Dedicated worker processes for transcription (see start_transcription_pool)
+_executor: Optional[ProcessPoolExecutor] = None
+_pending_jobs = 0
+
+
+def _warm_worker() -> None:
+    """No-op job used to fork workers up front"""
+
+
+def _get_worker_count() -> int:
+    """
+    Transcription processes for this server worker. Every server worker runs
+    its own pool, so the default splits the CPU cores between them instead of
+    starting one process per core in each.
+    """
+    if settings.transcription_workers:
+        return settings.transcription_workers
+    return max(1, (os.cpu_count() or 1) // settings.get_server_workers())
+
+
+def start_transcription_pool() -> None:
+    """
+    Load the Vosk model in this process, then fork the worker pool so
+    every worker shares the model pages copy-on-write instead of loading
+    its own copy. Where fork is unavailable (Windows), workers load the
+    model lazily on their first job.
+    """
+    global _executor
+    if _executor is not None:
+        return
+
+    try:
+        _get_vosk_model()
+    except Exception as e:
+        logger.warning("Vosk model not preloaded: %s", e)
+
+    mp_context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+
+    workers = _get_worker_count()
+    _executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context, initializer=configure_process_logging
+    )
+    for _ in range(workers):
+        _executor.submit(_warm_worker)
+
+
+def shutdown_transcription_pool() -> None:
+    """Stop worker processes (called on app shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def transcription_queue_full() -> bool:
+    """True when a new job would be rejected"""
+    return _pending_jobs >= settings.transcription_max_pending
+
+
 async def transcribe_audio(audio_file_path: str) -> str:
+    """Transcribe audio file using local Vosk model (text only)"""
+    return (await transcribe_audio_with_timings(audio_file_path))["text"]
+
+
+async def transcribe_audio_with_timings(audio_file_path: str) -> Dict[str, Any]:
     """
     Transcribe audio file using local Vosk model.
-    The input can be .webm from the browser; we convert it to 16kHz mono WAV
-    using ffmpeg (must be installed on the system).
+    Returns {"text": str, "words": [{word, start, end, conf}]}.
+    The input can be .webm from the browser; ffmpeg (must be installed on the
+    system) decodes it to 16kHz mono PCM that is streamed into the recognizer.
+    16-bit mono PCM WAV uploads skip ffmpeg entirely.
+    Runs on the dedicated worker pool; raises TranscriptionQueueFull when
+    the pool is saturated. TRANSCRIPTION_TIMEOUT (counted from submission)
+    is enforced inside the worker, which stops and kills ffmpeg; the job
+    keeps its pending slot until the worker has actually let go of it.
     """
+    global _pending_jobs
+    if transcription_queue_full():
+        raise TranscriptionQueueFull("Transcription queue is full, please retry shortly")
+
+    start_transcription_pool()
+    _pending_jobs += 1
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _transcribe_sync, audio_file_path)
+    deadline = time.time() + settings.transcription_timeout
+    job = loop.run_in_executor(_executor, _transcribe_sync, audio_file_path, deadline)
+    job.add_done_callback(_release_pending_slot)
+    try:
+        # The worker gives up at the deadline; the grace covers a read
+        # blocked inside one chunk
+        transcription = await asyncio.wait_for(
+            asyncio.shield(job),
+            timeout=settings.transcription_timeout + TIMEOUT_GRACE_SECONDS,
+        )
+    except (asyncio.TimeoutError, TranscriptionTimeout):
+        raise Exception(
+            f"Transcription timed out after {settings.transcription_timeout:.0f}s"
+        )
+    # Stage timings measured inside the worker process
+    for stage, seconds in transcription.pop("timings", {}).items():
+        observe_stage(stage, seconds)
+    return transcription
+
+
+def _release_pending_slot(job: "asyncio.Future") -> None:
+    global _pending_jobs
+    _pending_jobs -= 1
+    if not job.cancelled():
+        job.exception()  # Retrieved here so an abandoned job does not warn
+
+
+def _is_pcm_wav(audio_file_path: str) -> bool:
+    """True when the file is already 16-bit mono PCM WAV (no decode needed)"""
+    try:
+        with wave.open(audio_file_path, "rb") as wf:
+            return wf.getnchannels() == 1 and wf.getsampwidth() == 2
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    if deadline is not None and time.time() > deadline:
+        raise TranscriptionTimeout("Transcription deadline passed")
+
+
+def _recognize_stream(
+    rec: KaldiRecognizer,
+    read_chunk,
+    read_stage: str = "audio_read",
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Feed PCM chunks from read_chunk() into the recognizer until it returns b''.
+    "timings" holds seconds spent waiting on read_chunk (read_stage) and
+    inside the recognizer (vosk_recognition). Raises TranscriptionTimeout
+    once the wall-clock deadline passes.
+    """
+    texts = []
+    words = []
+    read_seconds = 0.0
+    recognize_seconds = 0.0
+
+    def collect(res: Dict[str, Any]) -> None:
+        if "text" in res:
+            texts.append(res["text"])
+        # Word timings (rec.SetWords(True))
+        words.extend(res.get("result", []))
+
+    while True:
+        _check_deadline(deadline)
+        start = time.perf_counter()
+        data = read_chunk()
+        read_seconds += time.perf_counter() - start
+        if len(data) == 0:
+            break
+        start = time.perf_counter()
+        if rec.AcceptWaveform(data):
+            collect(json.loads(rec.Result()))
+        recognize_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    collect(json.loads(rec.FinalResult()))
+    recognize_seconds += time.perf_counter() - start
+
+    return {
+        "text": " ".join(t.strip() for t in texts if t.strip()),
+        "words": words,
+        "timings": {read_stage: read_seconds, "vosk_recognition": recognize_seconds},
+    }
 
 
-def _transcribe_sync(audio_file_path: str) -> str:
-    tmp_wav = None
+def _transcribe_sync(audio_file_path: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+    ffmpeg_proc = None
     try:
-        # Convert input audio to 16kHz mono WAV using ffmpeg
-        fd, tmp_wav = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)
+        # Jobs that waited past their deadline in the queue are not started
+        _check_deadline(deadline)
+        model = _get_vosk_model()
+
+        # Fast path: already 16-bit mono PCM WAV, feed it directly
+        if _is_pcm_wav(audio_file_path):
+            with wave.open(audio_file_path, "rb") as wf:
+                rec = KaldiRecognizer(model, wf.getframerate())
+                rec.SetWords(True)
+                return _recognize_stream(
+                    rec, lambda: wf.readframes(PCM_CHUNK_FRAMES), read_stage="wav_read", deadline=deadline
+                )
 
+        # Decode to raw 16kHz mono PCM on ffmpeg's stdout so recognition
+        # overlaps with decoding and no intermediate WAV is written
         ffmpeg_cmd = [
             "ffmpeg",
-            "-y",
+            "-loglevel",
+            "error",
             "-i",
             audio_file_path,
             "-ar",
-            "16000",
+            str(SAMPLE_RATE),
             "-ac",
             "1",
             "-f",
-            "wav",
-            tmp_wav,
+            "s16le",
+            "pipe:1",
         ]
 
         try:
-            subprocess.run(
+            ffmpeg_proc = subprocess.Popen(
                 ffmpeg_cmd,
-                check=True,
-                stdout=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
             )
         except FileNotFoundError:
@@ -81,38 +274,28 @@ def _transcribe_sync(audio_file_path: str) -> str:
                 "ffmpeg not found. Please install ffmpeg and ensure it is on your PATH."
             )
 
-        model = _get_vosk_model()
-
-        wf = wave.open(tmp_wav, "rb")
-        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
-            raise RuntimeError("Audio must be 16-bit mono WAV after conversion.")
-
-        rec = KaldiRecognizer(model, wf.getframerate())
+        rec = KaldiRecognizer(model, SAMPLE_RATE)
         rec.SetWords(True)
+        transcription = _recognize_stream(
+            rec,
+            lambda: ffmpeg_proc.stdout.read(PCM_CHUNK_FRAMES * 2),
+            read_stage="ffmpeg_decode",
+            deadline=deadline,
+        )
 
-        texts = []
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            if rec.AcceptWaveform(data):
-                res = json.loads(rec.Result())
-                if "text" in res:
-                    texts.append(res["text"])
-
-        final_res = json.loads(rec.FinalResult())
-        if "text" in final_res:
-            texts.append(final_res["text"])
+        if ffmpeg_proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {ffmpeg_proc.returncode}")
 
-        transcript = " ".join(t.strip() for t in texts if t.strip())
-        return transcript
+        return transcription
 
+    except TranscriptionTimeout:
+        raise
     except Exception as e:
-        print(f"Error in Vosk transcription: {e}")
+        logger.warning("Error in Vosk transcription: %s", e)
         raise Exception(f"Failed to transcribe audio: {str(e)}")
     finally:
-        if tmp_wav and os.path.exists(tmp_wav):
-            try:
-                os.remove(tmp_wav)
-            except OSError:
-                pass
+        if ffmpeg_proc is not None:
+            ffmpeg_proc.stdout.close()
+            if ffmpeg_proc.poll() is None:
+                ffmpeg_proc.kill()
+                ffmpeg_proc.wait()
@@ -0,0 +1,137 @@
+# server-fastapi/profiling.py
+"""
+Opt-in statistical profiling of individual requests (pyinstrument).
+
+A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or is
+picked by PROFILING_SAMPLE_RATE. Its profile is written as speedscope JSON
+(open at https://www.speedscope.app) under PROFILE_DIR, named by the
+request id returned in the X-Request-ID response header, and can be fetched
+from GET /api/profiles/{request_id} with the same X-Profile header.
+
+The middleware is only installed when profiling is configured, so requests
+pay nothing when it is off.
+"""
+
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger("miral.profiling")
+
+PROFILE_DIR = Path(settings.profile_dir) if settings.profile_dir else Path(__file__).resolve().parent / "profiles"
+PROFILE_HEADER = b"x-profile"
+REQUEST_ID_HEADER = b"x-request-id"
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+
+def profiling_enabled() -> bool:
+    """True when profiling is configured and pyinstrument is importable"""
+    if not (settings.profiling_token or settings.profiling_sample_rate > 0):
+        return False
+    if Profiler is None:
+        logger.warning("Profiling configured but pyinstrument is not installed; profiling disabled")
+        return False
+    return True
+
+
+def _authorized(token: Optional[str]) -> bool:
+    return bool(settings.profiling_token) and token is not None and hmac.compare_digest(
+        token.encode("utf-8"), settings.profiling_token.encode("utf-8")
+    )
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _profile_path(request_id: str) -> Path:
+    return PROFILE_DIR / f"{request_id}.speedscope.json"
+
+
+def _write_profile(request_id: str, data: str) -> None:
+    """Store one profile and drop the oldest beyond PROFILES_KEPT"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    _profile_path(request_id).write_text(data, encoding="utf-8")
+
+    profiles = sorted(PROFILE_DIR.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime)
+    for stale in profiles[:max(0, len(profiles) - settings.profiles_kept)]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+class ProfilingMiddleware:
+    """Runs selected HTTP requests under pyinstrument (pure ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if _authorized(_header(scope, PROFILE_HEADER)):
+            return True
+        return random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _header(scope, REQUEST_ID_HEADER) or ""
+        if not _REQUEST_ID_PATTERN.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message["headers"]) + [
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        # async_mode="enabled" attributes time to this request's task only
+        profiler = Profiler(interval=settings.profiling_interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            try:
+                data = profiler.output(renderer=SpeedscopeRenderer())
+                await asyncio.to_thread(_write_profile, request_id, data)
+                logger.info("Profiled %s %s as %s", scope["method"], scope["path"], request_id)
+            except Exception as e:
+                logger.exception("Error storing profile %s: %s", request_id, e)
+
+
+profiles_router = APIRouter()
+
+
+@profiles_router.get("/api/profiles/{request_id}")
+async def get_profile(request_id: str, x_profile: Optional[str] = Header(None)):
+    """Download a stored profile (speedscope JSON); requires the X-Profile token"""
+    if not _authorized(x_profile):
+        raise HTTPException(status_code=403, detail='Profiling token required')
+    path = _profile_path(request_id)
+    if not _REQUEST_ID_PATTERN.fullmatch(request_id) or not path.is_file():
+        raise HTTPException(status_code=404, detail='Profile not found')
+    return FileResponse(path, media_type="application/json", filename=path.name)
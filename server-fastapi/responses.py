@@ -0,0 +1,44 @@
+# server-fastapi/responses.py
+"""
+Fast JSON encoding for large session payloads.
+
+Routes returning many sessions build their body with a precompiled
+TypeAdapter: ORM rows are validated and dumped to JSON bytes by pydantic-core
+in one step, skipping FastAPI's per-object response_model validation and
+jsonable_encoder. Everything else uses orjson as the default response class
+when it is installed.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from schemas import SessionResponse, SessionSummaryResponse
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
+
+SESSION_ADAPTER = TypeAdapter(SessionResponse)
+SESSION_LIST_ADAPTER = TypeAdapter(List[SessionResponse])
+SESSION_SUMMARY_LIST_ADAPTER = TypeAdapter(List[SessionSummaryResponse])
+
+
+def adapter_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Validate ORM rows (from_attributes) and serialize straight to JSON bytes"""
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
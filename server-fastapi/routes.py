@@ -1,34 +1,67 @@
 # server-fastapi/routes.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List, Dict, Any  # ← Add List, Dict, Any here
+from typing import Optional, List, Dict, Any, Tuple  # ← Add List, Dict, Any here
+from datetime import datetime
+import asyncio
+import base64
 import json
-import os
-import aiofiles
+import logging
 
-from database import get_db
+from database import get_db, get_read_db, is_replica_session, pin_reads_to_primary, AsyncSessionLocal
 from storage import storage
-from auth import verify_password
-from openai_service import transcribe_audio
-from audio_utils import (
-    detect_filler_words,
-    calculate_words_per_minute,
-    generate_confidence_score,
+from auth import (
+    verify_password_async,
+    hash_password_async,
+    needs_rehash,
+    create_user_token,
+    get_optional_user,
+    resolve_user_id,
+    verify_access_token,
 )
-from ollama_service import generate_feedback
+from openai_service import transcription_queue_full, TranscriptionQueueFull
+from session_pipeline import run_completion_pipeline
+from config import settings
+from streaming_transcription import streaming_transcriptions
+from cache import TTLCache
+from file_uploads import save_upload, remove_upload
+from timeseries_codec import decode_eye_contact, decode_posture
+from audio_utils import generate_confidence_score
+from ollama_service import (
+    generate_feedback,
+    generate_fallback_feedback,
+    generate_session_feedback,
+    live_feedback_cache,
+    live_feedback_cache_key,
+    ollama_breaker,
+    within_deadline,
+)
+from responses import (
+    adapter_response,
+    SESSION_ADAPTER,
+    SESSION_LIST_ADAPTER,
+    SESSION_SUMMARY_LIST_ADAPTER,
+)
+from http_cache import sessions_etag, session_cache_control, etag_matches, not_modified
 from schemas import (
     UserSignup,
     UserLogin,
     UserResponse,
     SessionCreate,
     SessionResponse,
+    SessionSummaryResponse,
     SessionCompleteResponse,
     LiveFeedbackRequest,
     LiveFeedbackResponse,
+    CompletionJobResponse,
+    UserStatsResponse,
 )
 
 router = APIRouter()
 
+logger = logging.getLogger("miral.routes")
+
 # ============ AUTH ROUTES ============
 
 @router.post("/api/auth/signup", response_model=dict)
@@ -38,43 +71,38 @@ async def signup(user_data: UserSignup, db: AsyncSession = Depends(get_db)):
     Matches: POST /api/auth/signup from routes.ts
     """
     try:
-        print(f"📝 Signup request received: email={user_data.email}, name={user_data.name}")
+        logger.info("Signup request received: email=%s, name=%s", user_data.email, user_data.name)
         
         # Validate required fields (Pydantic should handle this, but double-check)
         if not user_data.email or not user_data.password:
             raise HTTPException(status_code=400, detail='Email and password required')
         
-        # Check if user exists
-        existing_user = await storage.get_user(user_data.email, db)
-        if existing_user:
-            print(f"❌ User already exists: {user_data.email}")
-            raise HTTPException(status_code=400, detail='Email already registered')
-        
-        # Create user
-        print(f"✅ Creating new user: {user_data.email}")
+        # Create user; the unique email index rejects existing accounts
         user = await storage.create_user(
             email=user_data.email,
             password=user_data.password,
             name=user_data.name,
             db=db
         )
+        if user is None:
+            logger.info("User already exists: %s", user_data.email)
+            raise HTTPException(status_code=400, detail='Email already registered')
         
-        print(f"✅ User created successfully: {user.id}")
+        logger.info("User created: %s", user.id)
         return {
             "user": {
                 "id": user.id,
                 "email": user.email,
                 "name": user.name
-            }
+            },
+            "token": create_user_token(user),
+            "tokenType": "bearer"
         }
     
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        error_msg = f'Error in signup: {e}'
-        print(f"❌ {error_msg}")
-        print(f'Traceback: {traceback.format_exc()}')
+        logger.exception("Error in signup: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/api/auth/login", response_model=dict)
@@ -90,24 +118,49 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
         
         # Get user
         user = await storage.get_user(user_data.email, db)
-        if not user or not verify_password(user_data.password, user.password):
+        if not user or not await verify_password_async(user_data.password, user.password):
             raise HTTPException(status_code=401, detail='Invalid credentials')
         
+        # Upgrade the stored hash when the configured bcrypt cost has changed
+        if needs_rehash(user.password):
+            try:
+                new_hash = await hash_password_async(user_data.password)
+                await storage.update_user_password(user.id, new_hash, db)
+            except Exception as e:
+                logger.warning("Error rehashing password: %s", e)
+        
         return {
             "user": {
                 "id": user.id,
                 "email": user.email,
                 "name": user.name
-            }
+            },
+            "token": create_user_token(user),
+            "tokenType": "bearer"
         }
     
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        error_msg = f'Error in login: {e}'
-        print(error_msg)
-        print(f'Traceback: {traceback.format_exc()}')
+        logger.exception("Error in login: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/api/users/{user_id}/stats", response_model=UserStatsResponse)
+async def get_user_stats(
+    user_id: str,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Precomputed practice statistics for a user (averages, extremes, streaks, trend)
+    """
+    user_id = resolve_user_id(user_id, current_user)
+    try:
+        stats = await storage.get_user_stats(user_id, db)
+        return UserStatsResponse.from_stats(stats)
+    
+    except Exception as e:
+        logger.exception("Error fetching user stats: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============ SESSION ROUTES ============
@@ -115,81 +168,218 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
 @router.post("/api/sessions", response_model=SessionResponse)
 async def create_session(
     session_data: SessionCreate,
+    response: Response,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Create new practice session
     Matches: POST /api/sessions from routes.ts
     """
+    user_id = resolve_user_id(session_data.userId, current_user)
     try:
         session = await storage.create_session(
             topic=session_data.topic or 'Untitled Session',
-            user_id=session_data.userId,
+            user_id=user_id,
             db=db
         )
+        pin_reads_to_primary(response)
         return session
     
     except Exception as e:
-        print(f'Error creating session: {e}')
+        logger.exception("Error creating session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _encode_cursor(cursor: Optional[Tuple[datetime, str]]) -> Optional[str]:
+    """Opaque pagination cursor for (created_at, id)"""
+    if cursor is None:
+        return None
+    created_at, session_id = cursor
+    raw = f"{created_at.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, session_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), session_id
+    except Exception:
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+async def _list_sessions(
+    request: Request,
+    user_id: Optional[str],
+    current_user: Optional[UserResponse],
+    limit: Optional[int],
+    cursor: Optional[str],
+    summary: bool,
+    db: AsyncSession
+) -> Response:
+    """
+    Fetch one page and advertise the next one in the X-Next-Cursor header.
+    Without limit or cursor every session is returned, as before pagination.
+    """
+    if limit is None and cursor is not None:
+        limit = settings.sessions_page_size
+    sessions, next_cursor = await storage.get_sessions_page(
+        user_id=resolve_user_id(user_id, current_user),
+        limit=limit,
+        cursor=_decode_cursor(cursor),
+        db=db,
+        summary=summary
+    )
+    encoded = _encode_cursor(next_cursor)
+    
+    # Revalidate on every use; an unchanged page costs no serialization
+    etag = sessions_etag(sessions, encoded, 'summary' if summary else 'full')
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if encoded:
+        headers["X-Next-Cursor"] = encoded
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    return adapter_response(
+        SESSION_SUMMARY_LIST_ADAPTER if summary else SESSION_LIST_ADAPTER,
+        sessions,
+        headers=headers,
+    )
+
 @router.get("/api/sessions", response_model=List[SessionResponse])
 async def get_sessions(
+    request: Request,
     userId: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=settings.sessions_max_page_size),
+    cursor: Optional[str] = None,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get all sessions (optionally filtered by user)
+    Get sessions, newest first (optionally filtered by user)
     Matches: GET /api/sessions from routes.ts
+    Paginated with ?limit=: follow the X-Next-Cursor response header with
+    ?cursor=...; without limit or cursor all sessions are returned
     """
     try:
-        sessions = await storage.get_all_sessions(userId, db)
-        # Ensure we return a list even if empty
-        if sessions is None:
-            return []
-        # FastAPI will automatically convert SQLAlchemy models to Pydantic models
-        # using from_attributes=True in the Config
-        return list(sessions)
+        # Rows are validated and encoded in one pass by a precompiled TypeAdapter
+        return await _list_sessions(request, userId, current_user, limit, cursor, False, db)
     
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
         error_msg = f'Error fetching sessions: {e}'
-        print(error_msg)
-        print(f'Traceback: {traceback.format_exc()}')
+        logger.exception(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+@router.get("/api/sessions/summary", response_model=List[SessionSummaryResponse])
+async def get_session_summaries(
+    request: Request,
+    userId: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.sessions_max_page_size),
+    cursor: Optional[str] = None,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Lightweight session list (no transcript or eye contact / posture series)
+    Same pagination as GET /api/sessions
+    """
+    try:
+        return await _list_sessions(request, userId, current_user, limit, cursor, True, db)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error fetching session summaries: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _check_session_owner(session, current_user: Optional[UserResponse]) -> None:
+    """Refuse access to another user's session when the caller is authenticated"""
+    resolve_user_id(None, current_user)
+    if current_user and session.user_id and session.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail='Not allowed for this session')
+
 @router.get("/api/sessions/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: str, db: AsyncSession = Depends(get_db)):
+async def get_session(
+    request: Request,
+    session_id: str,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Get specific session by ID
     Matches: GET /api/sessions/:id from routes.ts
+    Sends ETag / Cache-Control; If-None-Match is answered with 304 from the
+    session's version columns alone.
     """
-    try:
-        session = await storage.get_session(session_id, db)
-        
-        if not session:
+    async def load(loader):
+        row = await loader(session_id, db)
+        if (not row or not row.completed_at) and is_replica_session(db):
+            # The replica may lag behind a just-created or just-completed session
+            async with AsyncSessionLocal() as primary_db:
+                row = await loader(session_id, primary_db)
+        if not row:
             raise HTTPException(status_code=404, detail='Session not found')
+        if not row.is_public:
+            _check_session_owner(row, current_user)
+        return row
+    
+    try:
+        if request.headers.get('if-none-match'):
+            version = await load(storage.get_session_version)
+            etag = sessions_etag([version])
+            if etag_matches(request, etag):
+                return not_modified(etag, session_cache_control(version))
         
-        return session
+        session = await load(storage.get_session)
+        return adapter_response(
+            SESSION_ADAPTER,
+            session,
+            headers={
+                "ETag": sessions_etag([session]),
+                "Cache-Control": session_cache_control(session),
+            },
+        )
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f'Error fetching session: {e}')
+        logger.exception("Error fetching session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/api/sessions/{session_id}/complete", response_model=SessionCompleteResponse)
+async def _read_small_upload(upload: UploadFile) -> bytes:
+    """Read a small binary form part, refusing anything over MAX_UPLOAD_BYTES"""
+    data = await upload.read(settings.max_upload_bytes + 1)
+    if len(data) > settings.max_upload_bytes:
+        raise ValueError('Part too large')
+    return data
+
+@router.post(
+    "/api/sessions/{session_id}/complete",
+    response_model=SessionCompleteResponse,
+    responses={202: {"model": CompletionJobResponse}},
+)
 async def complete_session(
     session_id: str,
+    response: Response,
     duration: int = Form(...),
-    eyeContactData: str = Form(...),
+    eyeContactData: Optional[str] = Form(None),
     postureData: str = Form("[]"),
     audio: Optional[UploadFile] = File(None),
+    eyeContactBin: Optional[UploadFile] = File(None),
+    postureBin: Optional[UploadFile] = File(None),
+    mode: str = "sync",
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Complete session with audio analysis
     Matches: POST /api/sessions/:id/complete from routes.ts
+    Eye contact / posture series may be sent as JSON (eyeContactData, postureData)
+    or compactly as binary parts (eyeContactBin, postureBin; see timeseries_codec).
+    With ?mode=async the work is queued and 202 with a job id is returned;
+    poll GET /api/jobs/{job_id} or subscribe to /api/jobs/{job_id}/events.
     """
     uploaded_file_path = None
     
@@ -197,126 +387,102 @@ async def complete_session(
         # Validate duration
         if duration < 0:
             raise HTTPException(status_code=400, detail='Invalid duration')
+        if mode not in ('sync', 'async'):
+            raise HTTPException(status_code=400, detail='Invalid mode')
         
-        # Parse JSON data
-        try:
-            eye_contact_data = json.loads(eyeContactData)
-            if not isinstance(eye_contact_data, list):
-                raise ValueError('eyeContactData must be an array')
-        except Exception:
-            raise HTTPException(status_code=400, detail='Invalid eyeContactData format')
+        # Parse time series (compact binary parts take precedence over JSON)
+        if eyeContactBin:
+            try:
+                eye_contact_data = decode_eye_contact(await _read_small_upload(eyeContactBin))
+            except Exception:
+                raise HTTPException(status_code=400, detail='Invalid eyeContactBin format')
+        elif eyeContactData is not None:
+            try:
+                eye_contact_data = json.loads(eyeContactData)
+                if not isinstance(eye_contact_data, list):
+                    raise ValueError('eyeContactData must be an array')
+            except Exception:
+                raise HTTPException(status_code=400, detail='Invalid eyeContactData format')
+        else:
+            raise HTTPException(status_code=400, detail='eyeContactData or eyeContactBin required')
         
-        try:
-            posture_data = json.loads(postureData)
-            if not isinstance(posture_data, list):
-                raise ValueError('postureData must be an array')
-        except Exception:
-            raise HTTPException(status_code=400, detail='Invalid postureData format')
+        if postureBin:
+            try:
+                posture_data = decode_posture(await _read_small_upload(postureBin))
+            except Exception:
+                raise HTTPException(status_code=400, detail='Invalid postureBin format')
+        else:
+            try:
+                posture_data = json.loads(postureData)
+                if not isinstance(posture_data, list):
+                    raise ValueError('postureData must be an array')
+            except Exception:
+                raise HTTPException(status_code=400, detail='Invalid postureData format')
         
         # Check if session exists
         session = await storage.get_session(session_id, db)
         if not session:
             raise HTTPException(status_code=404, detail='Session not found')
+        _check_session_owner(session, current_user)
         
-        # Initialize variables
-        transcript = ''
-        filler_words_count = 0
-        words_per_minute = 0
-        transcription_error = None
+        # Use the transcript streamed over the WebSocket during recording, if any
+        try:
+            streamed_transcription = await streaming_transcriptions.claim_transcript(session_id)
+        except Exception as e:
+            streamed_transcription = None
+            logger.warning("Error finalizing streamed transcript: %s", e)
         
-        # Process audio if provided
-        if audio:
-            # Create uploads directory
-            upload_dir = "server-fastapi/uploads"
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Save uploaded file
-            uploaded_file_path = os.path.join(upload_dir, audio.filename)
-            
-            async with aiofiles.open(uploaded_file_path, 'wb') as f:
-                content = await audio.read()
-                await f.write(content)
-            
-            # Always attempt local transcription (Vosk); handle any errors gracefully
-            try:
-                # Transcribe audio
-                transcript = await transcribe_audio(uploaded_file_path)
-                
-                # Analyze transcript
-                filler_words = detect_filler_words(transcript)
-                filler_words_count = sum(fw['count'] for fw in filler_words)
-                words_per_minute = calculate_words_per_minute(transcript, duration)
-            
-            except Exception as e:
-                transcription_error = str(e)
-                print(f'Error transcribing audio: {e}')
+        if streamed_transcription is None and audio:
+            # Reject early instead of queueing unbounded work
+            if mode == 'sync' and transcription_queue_full():
+                raise HTTPException(
+                    status_code=503,
+                    detail='Transcription service busy, please retry shortly',
+                    headers={'Retry-After': str(settings.transcription_retry_after)}
+                )
             
-            # Clean up uploaded file
-            if os.path.exists(uploaded_file_path):
-                os.remove(uploaded_file_path)
-                uploaded_file_path = None
+            # Stream upload to disk under a unique name
+            uploaded_file_path = await save_upload(audio)
         
-        # Calculate eye contact percentage
-        eye_contact_percentage = 0
-        if len(eye_contact_data) > 0:
-            eye_contact_percentage = round(
-                (sum(1 for d in eye_contact_data if d.get('hasEyeContact', False)) / len(eye_contact_data)) * 100
+        if mode == 'async':
+            job = await storage.create_completion_job(
+                session_id=session_id,
+                payload={
+                    'duration': duration,
+                    'eye_contact_data': eye_contact_data,
+                    'posture_data': posture_data,
+                    'transcription': streamed_transcription,
+                },
+                audio_path=uploaded_file_path,
+                db=db
             )
-        
-        # Calculate posture score
-        posture_score = 0
-        if len(posture_data) > 0:
-            posture_score = round(
-                sum(p['confidence'] for p in posture_data) / len(posture_data)
+            # The worker owns the upload from here on
+            uploaded_file_path = None
+            accepted = JSONResponse(
+                status_code=202,
+                content=CompletionJobResponse.from_job(job).model_dump(mode='json')
             )
+            pin_reads_to_primary(accepted)
+            return accepted
         
-        # Base confidence score using rule-based metrics
-        confidence_score = generate_confidence_score(
-            eye_contact_percentage,
-            words_per_minute,
-            filler_words_count,
-            duration
-        )
-
-        # === AI feedback via Ollama Gemma:2b ===
         try:
-            ollama_result = await generate_feedback(
-                eye_contact_pct=eye_contact_percentage,
-                posture_score=posture_score,
-                wpm=words_per_minute,
-                filler_count=filler_words_count,
+            updated_session, transcription_error = await run_completion_pipeline(
+                session=session,
                 duration=duration,
-                transcript=transcript or "",
-                role=session.topic or "general",
+                eye_contact_data=eye_contact_data,
+                posture_data=posture_data,
+                db=db,
+                transcription=streamed_transcription,
+                audio_path=uploaded_file_path,
+            )
+        except TranscriptionQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail='Transcription service busy, please retry shortly',
+                headers={'Retry-After': str(settings.transcription_retry_after)}
             )
-
-            strengths = ollama_result.get("strengths") or []
-            improvements = ollama_result.get("improvements") or []
-            confidence_score = int(ollama_result.get("confidence_score") or confidence_score)
-        except Exception as e:
-            # This should be rare because ollama_service already has its own fallback,
-            # but keep a safety net to avoid breaking the API.
-            print(f"Error generating Ollama feedback: {e}")
-            strengths = []
-            improvements = []
-        
-        # Update session
-        update_data = {
-            'duration': duration,
-            'eye_contact_percentage': eye_contact_percentage,
-            'confidence_score': confidence_score,
-            'words_per_minute': words_per_minute,
-            'filler_words_count': filler_words_count,
-            'posture_score': posture_score,
-            'posture_data': posture_data,
-            'transcript': transcript or None,
-            'strengths': strengths,
-            'improvements': improvements,
-            'eye_contact_data': eye_contact_data,
-        }
-        
-        updated_session = await storage.update_session(session_id, update_data, db)
         
+        pin_reads_to_primary(response)
         return {
             "session": updated_session,
             "transcriptionError": transcription_error
@@ -325,21 +491,204 @@ async def complete_session(
     except HTTPException:
         raise
     except Exception as e:
-        print(f'Error completing session: {e}')
-        
-        # Clean up file if error occurred
-        if uploaded_file_path and os.path.exists(uploaded_file_path):
-            os.remove(uploaded_file_path)
-        
+        logger.exception("Error completing session: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Clean up file on every exit path
+        if uploaded_file_path:
+            remove_upload(uploaded_file_path)
+
+
+async def _check_job_owner(job, current_user: Optional[UserResponse], db: AsyncSession) -> None:
+    """Apply the session ownership check to the job's session"""
+    session = await storage.get_session(job.session_id, db)
+    if session:
+        _check_session_owner(session, current_user)
+    else:
+        resolve_user_id(None, current_user)
+
+
+@router.get("/api/jobs/{job_id}", response_model=CompletionJobResponse)
+async def get_completion_job(
+    job_id: str,
+    response: Response,
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Status of an asynchronous session-completion job
+    """
+    job = await storage.get_completion_job(job_id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail='Job not found')
+    await _check_job_owner(job, current_user, db)
+    
+    session = None
+    if job.status == 'succeeded':
+        session = await storage.get_session(job.session_id, db)
+        # The worker wrote the session; the client's next reads must see it
+        pin_reads_to_primary(response)
+    return CompletionJobResponse.from_job(job, session)
+
+
+@router.websocket("/api/jobs/{job_id}/events")
+async def completion_job_events(websocket: WebSocket, job_id: str, token: Optional[str] = None):
+    """
+    Push job status changes until the job succeeds or fails.
+    Browsers cannot set headers on WebSockets, so the access token is
+    passed as ?token=.
+    """
+    await websocket.accept()
+    last_status = None
+    
+    try:
+        current_user = verify_access_token(token) if token else None
+        async with AsyncSessionLocal() as db:
+            job = await storage.get_completion_job(job_id, db)
+            if job:
+                await _check_job_owner(job, current_user, db)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail)[:120])
+        return
+    
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                job = await storage.get_completion_job(job_id, db)
+                if not job:
+                    await websocket.close(code=1008, reason='Job not found')
+                    return
+                
+                if job.status != last_status:
+                    last_status = job.status
+                    session = None
+                    if job.status == 'succeeded':
+                        session = await storage.get_session(job.session_id, db)
+                    response = CompletionJobResponse.from_job(job, session)
+                    await websocket.send_json(response.model_dump(mode='json'))
+            
+            if last_status in ('succeeded', 'failed'):
+                await websocket.close()
+                return
+            await asyncio.sleep(settings.completion_job_poll_interval)
+    
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/api/sessions/{session_id}/transcribe")
+async def stream_transcription(
+    websocket: WebSocket,
+    session_id: str,
+    format: str = "webm",
+    token: Optional[str] = None
+):
+    """
+    Incremental transcription while the user is recording.
+    Binary frames carry audio (browser webm chunks, or raw 16 kHz 16-bit
+    mono PCM with ?format=pcm). A text frame {"type": "stop"} finalizes
+    the transcript, which /complete then reuses. The access token is
+    passed as ?token=; the handshake is refused for another user's session.
+    """
+    # Short-lived DB session so no connection is held for the whole recording
+    try:
+        current_user = verify_access_token(token) if token else None
+        async with AsyncSessionLocal() as db:
+            session = await storage.get_session_version(session_id, db)
+        if not session:
+            raise HTTPException(status_code=404, detail='Session not found')
+        _check_session_owner(session, current_user)
+    except HTTPException as e:
+        # Closing before accept() rejects the handshake with 403
+        await websocket.close(code=1008, reason=str(e.detail)[:120])
+        return
+    
+    await websocket.accept()
+    
+    try:
+        stream = await streaming_transcriptions.open(session_id, raw_pcm=(format == "pcm"))
+    except Exception as e:
+        logger.warning("Error starting streaming transcription: %s", e)
+        await websocket.close(code=1013, reason=str(e)[:120])
+        return
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                await stream.feed(message["bytes"])
+                await websocket.send_json(stream.snapshot())
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    continue
+                if command.get("type") == "stop":
+                    await stream.finish(complete=True)
+                    await websocket.send_json(stream.snapshot())
+                    await websocket.close()
+                    break
+    
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception("Error in streaming transcription: %s", e)
+    finally:
+        # Release the decoder; without "stop" /complete transcribes the upload
+        try:
+            await stream.finish()
+        except Exception as e:
+            logger.warning("Error finalizing streaming transcription: %s", e)
 
 
+# Session id -> owner id ("" for anonymous sessions), so live polls skip the lookup
+_live_session_owners = TTLCache(
+    maxsize=settings.live_context_max_sessions,
+    ttl=settings.live_context_idle_seconds,
+)
+
+async def _may_use_live_session(session_id: str, current_user: Optional[UserResponse]) -> bool:
+    """
+    Whether the caller may use a session's coaching context and live
+    transcript. Another user's session is refused; an anonymous caller gets
+    stateless feedback for sessions that have an owner.
+    """
+    resolve_user_id(None, current_user)
+    owner = _live_session_owners.get(session_id)
+    if owner is None:
+        async with AsyncSessionLocal() as db:
+            row = await storage.get_session_version(session_id, db)
+        if not row:
+            raise HTTPException(status_code=404, detail='Session not found')
+        owner = row.user_id or ""
+        _live_session_owners.set(session_id, owner)
+    
+    if not owner:
+        return True
+    if current_user is None:
+        return False
+    if current_user.id != owner:
+        raise HTTPException(status_code=403, detail='Not allowed for this session')
+    return True
+
 @router.post("/api/feedback/live", response_model=LiveFeedbackResponse)
-async def live_feedback(metrics: LiveFeedbackRequest):
+async def live_feedback(
+    metrics: LiveFeedbackRequest,
+    current_user: Optional[UserResponse] = Depends(get_optional_user)
+):
     """
     Generate near-live AI coaching feedback using current session metrics.
+    With a sessionId the caller's own session conversation and streamed
+    transcript are used.
     """
     try:
+        session_id = None
+        if metrics.sessionId and await _may_use_live_session(metrics.sessionId, current_user):
+            session_id = metrics.sessionId
+        
         topic = metrics.topic or "general"
         base_confidence = generate_confidence_score(
             metrics.eyeContactPercentage,
@@ -358,17 +707,71 @@ async def live_feedback(metrics: LiveFeedbackRequest):
             context_parts.append(f"Head tilt: {metrics.headTilt}")
         
         context = ". ".join(context_parts) if context_parts else "User is well-positioned"
+        
+        # Fall back to the transcript streamed over the WebSocket for this session
+        transcript = metrics.transcript or ""
+        if not transcript and session_id:
+            transcript = streaming_transcriptions.running_transcript(session_id) or ""
 
-        feedback = await generate_feedback(
+        # Reuse the previous answer while the metrics stay in the same buckets
+        cache_key = live_feedback_cache_key(
             eye_contact_pct=metrics.eyeContactPercentage,
             posture_score=metrics.postureScore,
             wpm=metrics.wordsPerMinute,
             filler_count=metrics.fillerWordsCount,
-            duration=metrics.duration,
-            transcript=metrics.transcript or "",
-            role=topic,
-            context=context
+            topic=topic,
+            transcript=transcript,
+            face_position=metrics.facePosition,
+            head_tilt=metrics.headTilt,
+            is_in_frame=metrics.isInFrame,
+            session_id=session_id,
         )
+        feedback = live_feedback_cache.get(cache_key)
+        if feedback is None:
+            if session_id:
+                # Continue the session's conversation, sending only what changed
+                generation = generate_session_feedback(
+                    session_id=session_id,
+                    eye_contact_pct=metrics.eyeContactPercentage,
+                    posture_score=metrics.postureScore,
+                    wpm=metrics.wordsPerMinute,
+                    filler_count=metrics.fillerWordsCount,
+                    duration=metrics.duration,
+                    transcript=transcript,
+                    role=topic,
+                    context=context
+                )
+            else:
+                generation = generate_feedback(
+                    eye_contact_pct=metrics.eyeContactPercentage,
+                    posture_score=metrics.postureScore,
+                    wpm=metrics.wordsPerMinute,
+                    filler_count=metrics.fillerWordsCount,
+                    duration=metrics.duration,
+                    transcript=transcript,
+                    role=topic,
+                    context=context
+                )
+
+            def cache_feedback(result: Dict[str, Any]) -> None:
+                # Rule-based answers are cheap and would mask the model once it recovers
+                if not result.get("fallback"):
+                    live_feedback_cache.set(cache_key, result)
+
+            # Past the latency budget, answer with rule-based feedback; the model's
+            # late answer still lands in the cache for the next poll
+            feedback = await within_deadline(
+                generation,
+                settings.live_feedback_deadline,
+                fallback=lambda: generate_fallback_feedback(
+                    metrics.eyeContactPercentage,
+                    metrics.postureScore,
+                    metrics.wordsPerMinute,
+                    metrics.fillerWordsCount,
+                ),
+                on_late=cache_feedback,
+            )
+            cache_feedback(feedback)
 
         return {
             "summary": feedback.get("summary") or "Keep going – stay focused and confident!",
@@ -380,5 +783,13 @@ async def live_feedback(metrics: LiveFeedbackRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error generating live feedback: {e}")
+        logger.exception("Error generating live feedback: %s", e)
         raise HTTPException(status_code=500, detail="Unable to generate live feedback. Please try again.")
+
+
+@router.get("/api/feedback/cache")
+async def live_feedback_cache_stats():
+    """
+    Live feedback cache hit/miss counters and the Ollama circuit state
+    """
+    return {**live_feedback_cache.stats(), "ollamaCircuit": ollama_breaker.stats()}
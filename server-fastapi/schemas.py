@@ -1,7 +1,7 @@
 # server-fastapi/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, AliasChoices
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 
 # User schemas
 class UserSignup(BaseModel):
@@ -38,21 +38,113 @@ class SessionResponse(BaseModel):
     words_per_minute: float = 0.0
     filler_words_count: int = 0
     posture_score: float = 0.0
-    posture_data: List[Dict[str, Any]] = []
+    # Read through Session.*_series so compact (bytea) rows keep the JSON shape
+    posture_data: List[Dict[str, Any]] = Field(
+        default=[], validation_alias=AliasChoices('posture_series', 'posture_data')
+    )
     transcript: Optional[str] = None
     strengths: List[str] = []
     improvements: List[str] = []
-    eye_contact_data: List[Dict[str, Any]] = []
+    eye_contact_data: List[Dict[str, Any]] = Field(
+        default=[], validation_alias=AliasChoices('eye_contact_series', 'eye_contact_data')
+    )
+    analytics: Optional[Dict[str, Any]] = None
     is_public: bool = False
 
     class Config:
         from_attributes = True
 
+class SessionSummaryResponse(BaseModel):
+    """List-view session without transcript and time-series data"""
+    id: str
+    user_id: Optional[str] = None
+    topic: Optional[str] = None
+    mode: str = 'practice'
+    duration: int = 0
+    created_at: datetime
+    eye_contact_percentage: float = 0.0
+    confidence_score: float = 0.0
+    words_per_minute: float = 0.0
+    filler_words_count: int = 0
+    posture_score: float = 0.0
+    is_public: bool = False
+
+    class Config:
+        from_attributes = True
+
+class MetricStats(BaseModel):
+    average: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class UserStatsResponse(BaseModel):
+    userId: str
+    totalSessions: int = 0
+    totalDuration: int = 0
+    confidenceScore: MetricStats
+    eyeContactPercentage: MetricStats
+    wordsPerMinute: MetricStats
+    fillerWordsCount: MetricStats
+    postureScore: MetricStats
+    currentStreakDays: int = 0
+    bestStreakDays: int = 0
+    lastPracticeDate: Optional[date] = None
+    recentSessions: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_stats(cls, stats) -> "UserStatsResponse":
+        count = stats.session_count or 0
+
+        def metric(prefix: str) -> MetricStats:
+            total = getattr(stats, f'{prefix}_sum') or 0
+            return MetricStats(
+                average=round(total / count, 2) if count else 0.0,
+                min=getattr(stats, f'{prefix}_min'),
+                max=getattr(stats, f'{prefix}_max'),
+            )
+
+        return cls(
+            userId=stats.user_id,
+            totalSessions=count,
+            totalDuration=stats.total_duration or 0,
+            confidenceScore=metric('confidence'),
+            eyeContactPercentage=metric('eye_contact'),
+            wordsPerMinute=metric('wpm'),
+            fillerWordsCount=metric('filler'),
+            postureScore=metric('posture'),
+            currentStreakDays=stats.current_streak_days or 0,
+            bestStreakDays=stats.best_streak_days or 0,
+            lastPracticeDate=stats.last_practice_date,
+            recentSessions=stats.recent_sessions or [],
+        )
+
 class SessionCompleteResponse(BaseModel):
     session: SessionResponse
     transcriptionError: Optional[str] = None
 
 
+class CompletionJobResponse(BaseModel):
+    jobId: str
+    sessionId: str
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    transcriptionError: Optional[str] = None
+    session: Optional[SessionResponse] = None
+
+    @classmethod
+    def from_job(cls, job, session=None) -> "CompletionJobResponse":
+        return cls(
+            jobId=job.id,
+            sessionId=job.session_id,
+            status=job.status,
+            attempts=job.attempts or 0,
+            error=job.error,
+            transcriptionError=job.transcription_error,
+            session=SessionResponse.model_validate(session) if session else None,
+        )
+
+
 class LiveFeedbackRequest(BaseModel):
     eyeContactPercentage: float
     postureScore: float
@@ -64,6 +156,7 @@ class LiveFeedbackRequest(BaseModel):
     facePosition: Optional[str] = None
     headTilt: Optional[str] = None
     isInFrame: Optional[bool] = True
+    sessionId: Optional[str] = None  # Enables per-session context reuse
 
 
 class LiveFeedbackResponse(BaseModel):
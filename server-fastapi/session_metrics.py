@@ -0,0 +1,137 @@
+# server-fastapi/session_metrics.py
+"""
+Vectorized eye contact / posture analytics for a finished session.
+One NumPy pass over each series produces the headline scores plus the
+windowed and downsampled series the report page charts.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# The practice page samples every 500 ms and stamps samples with whole seconds
+DEFAULT_SAMPLE_INTERVAL = 0.5
+
+
+def _as_arrays(samples: List[Dict[str, Any]], value_key: str, dtype) -> Tuple[np.ndarray, np.ndarray]:
+    """Timestamps and values as arrays, sorted by timestamp"""
+    count = len(samples)
+    timestamps = np.fromiter((s.get("timestamp") or 0 for s in samples), dtype=np.float64, count=count)
+    values = np.fromiter((s.get(value_key) or 0 for s in samples), dtype=dtype, count=count)
+    if count > 1 and np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+    return timestamps, values
+
+
+def _windowed_mean(timestamps: np.ndarray, values: np.ndarray, window_seconds: float) -> List[Dict[str, float]]:
+    """Mean of values per fixed-width time window (empty windows are skipped)"""
+    window_index = ((timestamps - timestamps[0]) // window_seconds).astype(np.int64)
+    sums = np.bincount(window_index, weights=values)
+    counts = np.bincount(window_index)
+    occupied = np.nonzero(counts)[0]
+    means = sums[occupied] / counts[occupied]
+    starts = timestamps[0] + occupied * window_seconds
+    return [
+        {"start": round(float(start), 2), "value": round(float(mean), 2)}
+        for start, mean in zip(starts, means)
+    ]
+
+
+def _downsample(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> List[Dict[str, float]]:
+    """Average consecutive samples into at most max_points chart points"""
+    count = len(values)
+    if count > max_points:
+        edges = np.linspace(0, count, max_points + 1).astype(np.int64)[:-1]
+        sizes = np.diff(np.append(edges, count))
+        timestamps = np.add.reduceat(timestamps, edges) / sizes
+        values = np.add.reduceat(values, edges) / sizes
+    return [
+        {"timestamp": round(float(t), 2), "value": round(float(v), 2)}
+        for t, v in zip(timestamps, values)
+    ]
+
+
+def _sample_interval(timestamps: np.ndarray) -> float:
+    """Average spacing of samples; DEFAULT_SAMPLE_INTERVAL when they share one timestamp"""
+    if len(timestamps) > 1:
+        span = float(timestamps[-1] - timestamps[0])
+        if span > 0:
+            return span / (len(timestamps) - 1)
+    return DEFAULT_SAMPLE_INTERVAL
+
+
+def _longest_run_seconds(timestamps: np.ndarray, flags: np.ndarray) -> float:
+    """Duration of the longest run of consecutive True samples"""
+    if not flags.any():
+        return 0.0
+    padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    run_starts = np.nonzero(edges == 1)[0]
+    run_ends = np.nonzero(edges == -1)[0]  # Exclusive: index of the next sample
+
+    # A run lasts until the next sample; the last one for one more interval.
+    # Timestamps may be coarser than the sampling rate (several samples per
+    # second stamped with the same second), so never count less than one
+    # interval per sample
+    interval = _sample_interval(timestamps)
+    next_timestamps = np.append(timestamps, timestamps[-1] + interval)[run_ends]
+    durations = np.maximum(
+        next_timestamps - timestamps[run_starts],
+        (run_ends - run_starts) * interval,
+    )
+    return round(float(durations.max()), 2)
+
+
+def compute_session_metrics(
+    eye_contact_data: List[Dict[str, Any]],
+    posture_data: List[Dict[str, Any]],
+    window_seconds: float = 10.0,
+    max_points: int = 120,
+) -> Dict[str, Any]:
+    """
+    Returns eye_contact_percentage and posture_score (rounded like before)
+    and an "analytics" dict with windowed rollups, longest eye-contact streak,
+    posture variance and downsampled chart series.
+    """
+    eye_contact_percentage = 0
+    posture_score = 0
+    analytics: Dict[str, Any] = {
+        "windowSeconds": window_seconds,
+        "eyeContactWindows": [],
+        "eyeContactSeries": [],
+        "longestEyeContactStreakSeconds": 0.0,
+        "postureWindows": [],
+        "postureSeries": [],
+        "postureVariance": 0.0,
+        "postureBreakdown": {},
+    }
+
+    if eye_contact_data:
+        timestamps, contact = _as_arrays(eye_contact_data, "hasEyeContact", np.bool_)
+        contact_pct = contact.astype(np.float64) * 100
+        eye_contact_percentage = round(float(contact_pct.mean()))
+        analytics["eyeContactWindows"] = _windowed_mean(timestamps, contact_pct, window_seconds)
+        analytics["eyeContactSeries"] = _downsample(timestamps, contact_pct, max_points)
+        analytics["longestEyeContactStreakSeconds"] = _longest_run_seconds(timestamps, contact)
+
+    if posture_data:
+        timestamps, confidence = _as_arrays(posture_data, "confidence", np.float64)
+        posture_score = round(float(confidence.mean()))
+        analytics["postureWindows"] = _windowed_mean(timestamps, confidence, window_seconds)
+        analytics["postureSeries"] = _downsample(timestamps, confidence, max_points)
+        analytics["postureVariance"] = round(float(confidence.var()), 2)
+
+        labels, counts = np.unique(
+            np.array([s.get("posture") or "unknown" for s in posture_data]), return_counts=True
+        )
+        analytics["postureBreakdown"] = {
+            str(label): round(float(count) * 100 / len(posture_data), 1)
+            for label, count in zip(labels, counts)
+        }
+
+    return {
+        "eye_contact_percentage": eye_contact_percentage,
+        "posture_score": posture_score,
+        "analytics": analytics,
+    }
@@ -0,0 +1,143 @@
+# server-fastapi/session_pipeline.py
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Dict, Any, Tuple
+
+from storage import storage
+from models import Session
+from openai_service import transcribe_audio_with_timings, TranscriptionQueueFull
+from audio_utils import analyze_transcript, generate_confidence_score
+from ollama_service import generate_feedback, generate_fallback_feedback, end_live_session, within_deadline
+from timeseries_codec import encode_eye_contact, encode_posture
+from session_metrics import compute_session_metrics
+from config import settings
+from metrics import stage_timer
+
+logger = logging.getLogger("miral.pipeline")
+
+
+async def run_completion_pipeline(
+    session: Session,
+    duration: int,
+    eye_contact_data: List[Dict[str, Any]],
+    posture_data: List[Dict[str, Any]],
+    db: AsyncSession,
+    transcription: Optional[Dict[str, Any]] = None,
+    audio_path: Optional[str] = None,
+) -> Tuple[Session, Optional[str]]:
+    """
+    Transcribe, score and store a finished session.
+    Shared by the synchronous /complete endpoint and the completion job workers.
+    A ready transcription ({"text", "words"}, streamed during recording)
+    skips transcribing the upload.
+    Returns the updated session and the transcription error, if any;
+    TranscriptionQueueFull is propagated so callers can back off.
+    """
+    transcription_error = None
+    # Live coaching for this session is over
+    end_live_session(session.id)
+
+    if transcription is None and audio_path:
+        # Always attempt local transcription (Vosk); handle any errors gracefully
+        try:
+            transcription = await transcribe_audio_with_timings(audio_path)
+        except TranscriptionQueueFull:
+            raise
+        except Exception as e:
+            transcription_error = str(e)
+            logger.warning("Error transcribing audio: %s", e)
+
+    transcription = transcription or {}
+    transcript = transcription.get('text') or ''
+
+    # Fillers, WPM, pacing and pauses in one pass over the word-timed result
+    speech = analyze_transcript(
+        transcript,
+        duration,
+        words=transcription.get('words'),
+        window_seconds=settings.speech_window_seconds,
+        pause_threshold=settings.speech_pause_threshold,
+    )
+    filler_words_count = speech['filler_words_count']
+    words_per_minute = speech['words_per_minute']
+
+    # Eye contact percentage, posture score and chart series in one vectorized pass
+    metrics = compute_session_metrics(
+        eye_contact_data,
+        posture_data,
+        window_seconds=settings.metrics_window_seconds,
+        max_points=settings.metrics_max_chart_points,
+    )
+    eye_contact_percentage = metrics['eye_contact_percentage']
+    posture_score = metrics['posture_score']
+
+    # Base confidence score using rule-based metrics
+    confidence_score = generate_confidence_score(
+        eye_contact_percentage,
+        words_per_minute,
+        filler_words_count,
+        duration
+    )
+
+    # === AI feedback via Ollama Gemma:2b ===
+    try:
+        ollama_result = await within_deadline(
+            generate_feedback(
+                eye_contact_pct=eye_contact_percentage,
+                posture_score=posture_score,
+                wpm=words_per_minute,
+                filler_count=filler_words_count,
+                duration=duration,
+                transcript=transcript,
+                role=session.topic or "general",
+            ),
+            settings.completion_feedback_deadline,
+            fallback=lambda: generate_fallback_feedback(
+                eye_contact_percentage, posture_score, words_per_minute, filler_words_count
+            ),
+        )
+
+        strengths = ollama_result.get("strengths") or []
+        improvements = ollama_result.get("improvements") or []
+        confidence_score = int(ollama_result.get("confidence_score") or confidence_score)
+    except Exception as e:
+        # This should be rare because ollama_service already has its own fallback,
+        # but keep a safety net to avoid breaking the API.
+        logger.exception("Error generating Ollama feedback: %s", e)
+        strengths = []
+        improvements = []
+
+    # Update session
+    if settings.compact_timeseries_storage:
+        series_data = {
+            'eye_contact_blob': encode_eye_contact(eye_contact_data),
+            'posture_blob': encode_posture(posture_data),
+            'eye_contact_data': [],
+            'posture_data': [],
+        }
+    else:
+        series_data = {
+            'eye_contact_blob': None,
+            'posture_blob': None,
+            'eye_contact_data': eye_contact_data,
+            'posture_data': posture_data,
+        }
+    
+    update_data = {
+        'duration': duration,
+        'eye_contact_percentage': eye_contact_percentage,
+        'confidence_score': confidence_score,
+        'words_per_minute': words_per_minute,
+        'filler_words_count': filler_words_count,
+        'posture_score': posture_score,
+        'transcript': transcript or None,
+        'strengths': strengths,
+        'improvements': improvements,
+        'analytics': {**metrics['analytics'], 'speech': speech},
+        **series_data,
+    }
+
+    with stage_timer("db_update"):
+        updated_session = await storage.update_session(session.id, update_data, db, completed=True)
+    return updated_session, transcription_error
@@ -1,12 +1,85 @@
 # server-fastapi/storage.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, insert, update, or_, and_, func, tuple_
 from sqlalchemy.sql import desc
-from typing import Optional, List, Dict, Any
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta
 import uuid
 
-from models import User, Session
-from auth import hash_password
+from models import User, Session, CompletionJob, UserStats
+from config import settings
+from auth import hash_password_async
+
+# Columns for list views: everything except transcript and time-series JSONB
+SESSION_SUMMARY_COLUMNS = (
+    Session.id,
+    Session.user_id,
+    Session.topic,
+    Session.mode,
+    Session.duration,
+    Session.created_at,
+    Session.eye_contact_percentage,
+    Session.confidence_score,
+    Session.words_per_minute,
+    Session.filler_words_count,
+    Session.posture_score,
+    Session.is_public,
+    Session.completed_at,
+    Session.updated_at,
+)
+
+# Enough to authorize a request and compute the session's ETag
+SESSION_VERSION_COLUMNS = (
+    Session.id,
+    Session.user_id,
+    Session.is_public,
+    Session.created_at,
+    Session.completed_at,
+    Session.updated_at,
+)
+
+# (stats column prefix, session attribute) pairs tracked in UserStats
+USER_STATS_METRICS = (
+    ('confidence', 'confidence_score'),
+    ('eye_contact', 'eye_contact_percentage'),
+    ('wpm', 'words_per_minute'),
+    ('filler', 'filler_words_count'),
+    ('posture', 'posture_score'),
+)
+
+def apply_session_to_stats(stats: UserStats, session: Any) -> None:
+    """Fold one completed session into a user's rollup"""
+    stats.session_count = (stats.session_count or 0) + 1
+    stats.total_duration = (stats.total_duration or 0) + (session.duration or 0)
+    
+    for prefix, attr in USER_STATS_METRICS:
+        value = getattr(session, attr) or 0
+        setattr(stats, f'{prefix}_sum', (getattr(stats, f'{prefix}_sum') or 0) + value)
+        current_min = getattr(stats, f'{prefix}_min')
+        current_max = getattr(stats, f'{prefix}_max')
+        setattr(stats, f'{prefix}_min', value if current_min is None else min(current_min, value))
+        setattr(stats, f'{prefix}_max', value if current_max is None else max(current_max, value))
+    
+    # Consecutive practice days (sessions completed out of order don't move the streak)
+    practice_date = session.created_at.date()
+    last_date = stats.last_practice_date
+    if last_date is None or practice_date > last_date:
+        if last_date is not None and (practice_date - last_date).days == 1:
+            stats.current_streak_days = (stats.current_streak_days or 0) + 1
+        else:
+            stats.current_streak_days = 1
+        stats.last_practice_date = practice_date
+        stats.best_streak_days = max(stats.best_streak_days or 0, stats.current_streak_days)
+    
+    recent = list(stats.recent_sessions or [])
+    recent.append({
+        'sessionId': session.id,
+        'createdAt': session.created_at.isoformat(),
+        'confidenceScore': session.confidence_score or 0,
+    })
+    recent.sort(key=lambda entry: entry['createdAt'])
+    stats.recent_sessions = recent[-settings.user_stats_trend_length:]
 
 class DatabaseStorage:
     """
@@ -20,25 +93,27 @@ class DatabaseStorage:
         user_id: Optional[str],
         db: AsyncSession
     ) -> Session:
-        """Create new practice session"""
-        new_session = Session(
-            id=str(uuid.uuid4()),
-            topic=topic,
-            user_id=user_id,
-            duration=0,
-            eye_contact_percentage=0,
-            confidence_score=0,
-            words_per_minute=0,
-            filler_words_count=0,
-            transcript='',
-            strengths=[],
-            improvements=[],
-            eye_contact_data=[],
+        """Create new practice session (one INSERT ... RETURNING, no refresh)"""
+        result = await db.execute(
+            insert(Session)
+            .values(
+                id=str(uuid.uuid4()),
+                topic=topic,
+                user_id=user_id,
+                duration=0,
+                eye_contact_percentage=0,
+                confidence_score=0,
+                words_per_minute=0,
+                filler_words_count=0,
+                transcript='',
+                strengths=[],
+                improvements=[],
+                eye_contact_data=[],
+            )
+            .returning(Session)
         )
-        
-        db.add(new_session)
+        new_session = result.scalar_one()
         await db.commit()
-        await db.refresh(new_session)
         return new_session
     
     async def get_session(self, session_id: str, db: AsyncSession) -> Optional[Session]:
@@ -48,45 +123,165 @@ class DatabaseStorage:
         )
         return result.scalar_one_or_none()
     
-    async def get_all_sessions(
-        self, 
-        user_id: Optional[str],
-        db: AsyncSession
-    ) -> List[Session]:
-        """Get all sessions, optionally filtered by user"""
-        if user_id:
-            return await self.get_user_sessions(user_id, db)
-        
+    async def get_session_version(self, session_id: str, db: AsyncSession) -> Optional[Any]:
+        """Ownership and version columns of a session (no payload columns)"""
         result = await db.execute(
-            select(Session).order_by(desc(Session.created_at))
+            select(*SESSION_VERSION_COLUMNS).where(Session.id == session_id)
         )
-        return result.scalars().all()
+        return result.first()
     
-    async def get_user_sessions(self, user_id: str, db: AsyncSession) -> List[Session]:
-        """Get all sessions for a specific user"""
-        result = await db.execute(
-            select(Session)
-            .where(Session.user_id == user_id)
-            .order_by(desc(Session.created_at))
-        )
-        return result.scalars().all()
+    async def get_sessions_page(
+        self,
+        user_id: Optional[str],
+        limit: Optional[int],
+        cursor: Optional[Tuple[datetime, str]],
+        db: AsyncSession,
+        summary: bool = False
+    ) -> Tuple[List[Any], Optional[Tuple[datetime, str]]]:
+        """
+        Get one page of sessions, newest first, optionally filtered by user.
+        Keyset pagination on (created_at, id): pass the returned cursor to get
+        the next page. summary=True skips the transcript and time-series columns.
+        Returns (rows, next_cursor); next_cursor is None on the last page.
+        limit=None returns every matching session as a single page.
+        """
+        if summary:
+            query = select(*SESSION_SUMMARY_COLUMNS)
+        else:
+            query = select(Session)
+        
+        if user_id:
+            query = query.where(Session.user_id == user_id)
+        if cursor:
+            query = query.where(tuple_(Session.created_at, Session.id) < tuple_(*cursor))
+        
+        query = query.order_by(desc(Session.created_at), desc(Session.id))
+        if limit is not None:
+            query = query.limit(limit + 1)
+        result = await db.execute(query)
+        rows = result.all() if summary else result.scalars().all()
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
     
     async def update_session(
         self, 
         session_id: str, 
         data: Dict[str, Any],
-        db: AsyncSession
-    ) -> Session:
-        """Update session with analysis results"""
-        await db.execute(
+        db: AsyncSession,
+        completed: bool = False
+    ) -> Optional[Session]:
+        """
+        Update session with analysis results in one UPDATE ... RETURNING.
+        completed=True marks the session complete and, the first time only,
+        folds it into the owner's UserStats rollup in the same transaction.
+        """
+        values = dict(data)
+        returning = [Session]
+        if completed:
+            # completed_at only changes on the first completion; now() is the
+            # transaction timestamp, so equality in RETURNING detects that case
+            values['completed_at'] = func.coalesce(Session.completed_at, func.now())
+            returning.append((Session.completed_at == func.now()).label('first_completion'))
+        
+        result = await db.execute(
             update(Session)
             .where(Session.id == session_id)
-            .values(**data)
+            .values(**values)
+            .returning(*returning)
+            .execution_options(populate_existing=True)
         )
+        row = result.first()
+        if row is None:
+            await db.rollback()
+            return None
+        session = row[0]
+        
+        if completed and row.first_completion and session.user_id:
+            await self._record_user_stats(session, db)
+        
         await db.commit()
+        return session
+    
+    async def _compute_user_stats(self, user_id: str, db: AsyncSession) -> UserStats:
+        """Build a user's rollup from their completed history (not persisted)"""
+        result = await db.execute(
+            select(*SESSION_SUMMARY_COLUMNS)
+            .where(
+                Session.user_id == user_id,
+                or_(Session.completed_at.is_not(None), Session.duration > 0)
+            )
+            .order_by(Session.created_at)
+        )
+        stats = UserStats(
+            user_id=user_id,
+            session_count=0,
+            total_duration=0,
+            current_streak_days=0,
+            best_streak_days=0,
+            recent_sessions=[],
+            **{f'{prefix}_sum': 0 for prefix, _ in USER_STATS_METRICS}
+        )
+        for row in result.all():
+            apply_session_to_stats(stats, row)
+        return stats
+    
+    async def _rebuild_user_stats(self, user_id: str, db: AsyncSession) -> bool:
+        """
+        Build a user's rollup from their completed history and insert it.
+        Returns False if another transaction created the row first.
+        """
+        stats = await self._compute_user_stats(user_id, db)
+        values = {
+            column.name: getattr(stats, column.name)
+            for column in UserStats.__table__.columns
+            if column.name != 'updated_at'
+        }
+        inserted = await db.execute(
+            pg_insert(UserStats)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[UserStats.user_id])
+            .returning(UserStats.user_id)
+        )
+        return inserted.first() is not None
+    
+    async def _record_user_stats(self, session: Session, db: AsyncSession) -> None:
+        """Add a newly completed session to its owner's rollup"""
+        result = await db.execute(
+            select(UserStats)
+            .where(UserStats.user_id == session.user_id)
+            .with_for_update()
+        )
+        stats = result.scalar_one_or_none()
+        if stats is None:
+            # First rollup for this user: built from history, which already includes this session
+            if await self._rebuild_user_stats(session.user_id, db):
+                return
+            result = await db.execute(
+                select(UserStats)
+                .where(UserStats.user_id == session.user_id)
+                .with_for_update()
+            )
+            stats = result.scalar_one()
         
-        # Fetch and return updated session
-        return await self.get_session(session_id, db)
+        apply_session_to_stats(stats, session)
+    
+    async def get_user_stats(self, user_id: str, db: AsyncSession) -> UserStats:
+        """
+        Get a user's rollup. Read-only: without a stored row (no session
+        completed since rollups were introduced) it is computed from history
+        but not saved; the next completion persists it.
+        """
+        result = await db.execute(
+            select(UserStats).where(UserStats.user_id == user_id)
+        )
+        stats = result.scalar_one_or_none()
+        if stats is None:
+            stats = await self._compute_user_stats(user_id, db)
+        return stats
     
     async def create_user(
         self, 
@@ -94,22 +289,38 @@ class DatabaseStorage:
         password: str, 
         name: Optional[str],
         db: AsyncSession
-    ) -> User:
-        """Create new user with hashed password"""
-        hashed_password = hash_password(password)
+    ) -> Optional[User]:
+        """
+        Create new user with hashed password.
+        One INSERT ... ON CONFLICT DO NOTHING RETURNING; returns None if the
+        email is already registered.
+        """
+        hashed_password = await hash_password_async(password)
         
-        new_user = User(
-            id=str(uuid.uuid4()),
-            email=email,
-            password=hashed_password,
-            name=name
+        result = await db.execute(
+            pg_insert(User)
+            .values(
+                id=str(uuid.uuid4()),
+                email=email,
+                password=hashed_password,
+                name=name
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        
-        db.add(new_user)
+        new_user = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(new_user)
         return new_user
     
+    async def update_user_password(self, user_id: str, hashed_password: str, db: AsyncSession) -> None:
+        """Replace a user's stored password hash"""
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(password=hashed_password)
+        )
+        await db.commit()
+    
     async def get_user(self, email: str, db: AsyncSession) -> Optional[User]:
         """Get user by email"""
         result = await db.execute(
@@ -124,5 +335,138 @@ class DatabaseStorage:
         )
         return result.scalar_one_or_none()
 
+    async def create_completion_job(
+        self,
+        session_id: str,
+        payload: Dict[str, Any],
+        audio_path: Optional[str],
+        db: AsyncSession
+    ) -> CompletionJob:
+        """Queue a session completion for the job workers"""
+        job = CompletionJob(
+            id=str(uuid.uuid4()),
+            session_id=session_id,
+            status='queued',
+            payload=payload,
+            audio_path=audio_path,
+            attempts=0,
+        )
+        
+        db.add(job)
+        await db.commit()
+        return job
+    
+    async def get_completion_job(self, job_id: str, db: AsyncSession) -> Optional[CompletionJob]:
+        """Get completion job by ID"""
+        result = await db.execute(
+            select(CompletionJob).where(CompletionJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+    
+    async def claim_completion_job(
+        self,
+        worker_id: str,
+        stale_after_seconds: float,
+        max_attempts: int,
+        db: AsyncSession
+    ) -> Optional[CompletionJob]:
+        """
+        Atomically claim the oldest queued job (or a running job whose worker
+        went silent). SKIP LOCKED lets many workers poll without blocking.
+        """
+        next_job = (
+            select(CompletionJob.id)
+            .where(
+                or_(
+                    CompletionJob.status == 'queued',
+                    and_(
+                        CompletionJob.status == 'running',
+                        CompletionJob.locked_at < func.now() - timedelta(seconds=stale_after_seconds),
+                        CompletionJob.attempts < max_attempts,
+                    ),
+                )
+            )
+            .order_by(CompletionJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(CompletionJob)
+            .where(CompletionJob.id == next_job)
+            .values(
+                status='running',
+                attempts=CompletionJob.attempts + 1,
+                locked_by=worker_id,
+                locked_at=func.now(),
+            )
+            .returning(CompletionJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await db.commit()
+        return job
+    
+    async def finish_completion_job(
+        self,
+        job_id: str,
+        status: str,
+        db: AsyncSession,
+        error: Optional[str] = None,
+        transcription_error: Optional[str] = None,
+        refund_attempt: bool = False
+    ) -> None:
+        """
+        Record a job outcome; status 'queued' hands it back for a retry.
+        refund_attempt undoes the claim's attempt count when the job never
+        got to run (e.g. the transcription queue was full).
+        """
+        values = dict(
+            status=status,
+            error=error,
+            transcription_error=transcription_error,
+            locked_by=None,
+            locked_at=None,
+        )
+        if refund_attempt:
+            values['attempts'] = func.greatest(CompletionJob.attempts - 1, 0)
+        await db.execute(
+            update(CompletionJob)
+            .where(CompletionJob.id == job_id)
+            .values(**values)
+        )
+        await db.commit()
+    
+    async def fail_stale_completion_jobs(
+        self,
+        stale_after_seconds: float,
+        max_attempts: int,
+        db: AsyncSession
+    ) -> List[CompletionJob]:
+        """
+        Mark running jobs whose worker went silent on their last attempt as
+        failed; claim_completion_job no longer picks them up, so they would
+        otherwise stay running forever. Returns the jobs that were failed.
+        """
+        result = await db.execute(
+            update(CompletionJob)
+            .where(
+                CompletionJob.status == 'running',
+                CompletionJob.locked_at < func.now() - timedelta(seconds=stale_after_seconds),
+                CompletionJob.attempts >= max_attempts,
+            )
+            .values(
+                status='failed',
+                error='Worker stopped responding',
+                locked_by=None,
+                locked_at=None,
+            )
+            .returning(CompletionJob)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = list(result.scalars().all())
+        await db.commit()
+        return jobs
+
 # Global storage instance
 storage = DatabaseStorage()
@@ -0,0 +1,253 @@
+"""
+Incremental Vosk transcription for audio streamed over a WebSocket
+while the user is still speaking. One KaldiRecognizer per session;
+the finished transcript is handed to complete_session so /complete
+does not have to transcribe the upload again.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from vosk import KaldiRecognizer
+
+from config import settings
+from openai_service import _get_vosk_model, SAMPLE_RATE
+from audio_utils import detect_filler_words
+
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # 16-bit mono PCM
+PCM_READ_SIZE = 8000  # 0.25 s of audio per recognizer call
+
+# Kaldi releases the GIL while decoding; a dedicated pool caps how many
+# recognizer calls run at once without occupying the default executor
+# that file I/O and other to_thread users share
+_recognition_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.streaming_recognition_workers),
+    thread_name_prefix="vosk-stream",
+)
+
+
+class StreamingTranscriber:
+    """
+    Feeds audio chunks into a per-session recognizer.
+    Compressed chunks (browser webm/opus) are decoded by a long-running
+    ffmpeg process; raw 16 kHz 16-bit mono PCM is fed directly.
+    """
+
+    def __init__(self, session_id: str, raw_pcm: bool = False):
+        self.session_id = session_id
+        self.raw_pcm = raw_pcm
+        self.recognizer = KaldiRecognizer(_get_vosk_model(), SAMPLE_RATE)
+        self.recognizer.SetWords(True)
+
+        self.segments: List[str] = []
+        self.words: List[Dict] = []
+        self.partial = ""
+        self.audio_bytes = 0
+        self.filler_counts: Counter = Counter()
+        self.finished = False
+        self.finished_at: Optional[float] = None
+        # Set only when the client sent "stop" at the end of the recording;
+        # a stream cut short (dropped socket) holds a partial transcript
+        self.complete = False
+        self._finished_event = asyncio.Event()
+
+        # Recognizer calls are serialized through this lock (Kaldi is not re-entrant)
+        self._lock = asyncio.Lock()
+        self._finish_lock = asyncio.Lock()
+        self._ffmpeg: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Spawn the ffmpeg decoder when the client sends compressed audio"""
+        if self.raw_pcm:
+            return
+        try:
+            self._ffmpeg = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-loglevel", "quiet",
+                "-i", "pipe:0",
+                "-ar", str(SAMPLE_RATE), "-ac", "1",
+                "-f", "s16le", "pipe:1",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "ffmpeg not found. Please install ffmpeg and ensure it is on your PATH."
+            )
+        self._reader = asyncio.create_task(self._read_decoded_pcm())
+
+    async def _read_decoded_pcm(self) -> None:
+        while True:
+            data = await self._ffmpeg.stdout.read(PCM_READ_SIZE)
+            if not data:
+                break
+            await self._accept_pcm(data)
+
+    async def _accept_pcm(self, data: bytes) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            self.audio_bytes += len(data)
+            if await loop.run_in_executor(_recognition_executor, self.recognizer.AcceptWaveform, data):
+                self._add_segment(json.loads(self.recognizer.Result()))
+                self.partial = ""
+            else:
+                self.partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+    def _add_segment(self, result: Dict) -> None:
+        self.words.extend(result.get("result", []))
+        text = result.get("text", "").strip()
+        if not text:
+            return
+        self.segments.append(text)
+        for filler in detect_filler_words(text):
+            self.filler_counts[filler["word"]] += filler["count"]
+
+    async def feed(self, chunk: bytes) -> None:
+        """Accept one audio chunk from the client"""
+        if self.finished:
+            return
+        if self.raw_pcm:
+            await self._accept_pcm(chunk)
+            return
+        self._ffmpeg.stdin.write(chunk)
+        await self._ffmpeg.stdin.drain()
+
+    async def finish(self, complete: bool = False) -> str:
+        """
+        Flush the decoder and recognizer; safe to call more than once.
+        Pass complete=True when the client signalled the end of the recording.
+        """
+        async with self._finish_lock:
+            if complete:
+                self.complete = True
+            if self.finished:
+                return self.transcript
+
+            if self._ffmpeg is not None:
+                try:
+                    self._ffmpeg.stdin.close()
+                except Exception:
+                    pass
+                if self._reader is not None:
+                    await self._reader
+                await self._ffmpeg.wait()
+
+            async with self._lock:
+                self._add_segment(json.loads(self.recognizer.FinalResult()))
+                self.partial = ""
+
+            self.finished = True
+            self.finished_at = time.monotonic()
+            self._finished_event.set()
+            return self.transcript
+
+    async def wait_finished(self, timeout: float) -> None:
+        """Wait up to timeout seconds for the client's stop (or a dropped socket)"""
+        try:
+            await asyncio.wait_for(self._finished_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def abort(self) -> None:
+        """Stop the decoder without producing a result"""
+        if self._ffmpeg is not None and self._ffmpeg.returncode is None:
+            self._ffmpeg.kill()
+            await self._ffmpeg.wait()
+        if self._reader is not None:
+            self._reader.cancel()
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.segments)
+
+    def snapshot(self) -> Dict:
+        """Running transcript and metrics sent back to the client"""
+        seconds = self.audio_bytes / BYTES_PER_SECOND
+        text = " ".join(t for t in (self.transcript, self.partial) if t)
+        word_count = len(text.split())
+
+        filler_counts = Counter(self.filler_counts)
+        if self.partial:
+            for filler in detect_filler_words(self.partial):
+                filler_counts[filler["word"]] += filler["count"]
+
+        return {
+            "type": "final" if self.finished else "partial",
+            "transcript": self.transcript,
+            "partial": self.partial,
+            "audioSeconds": round(seconds, 2),
+            "wordsPerMinute": round(word_count / (seconds / 60)) if seconds > 0 else 0,
+            "fillerWordsCount": sum(filler_counts.values()),
+            "fillerWords": [
+                {"word": word, "count": count} for word, count in filler_counts.items()
+            ],
+        }
+
+
+class StreamingTranscriptionRegistry:
+    """
+    Tracks one transcriber per session. Finished transcripts are kept
+    until complete_session claims them or they go stale.
+    """
+
+    def __init__(self, max_sessions: int, finished_ttl: float):
+        self.max_sessions = max_sessions
+        self.finished_ttl = finished_ttl
+        self._sessions: Dict[str, StreamingTranscriber] = {}
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        stale = [
+            session_id for session_id, stream in self._sessions.items()
+            if stream.finished and now - stream.finished_at > self.finished_ttl
+        ]
+        for session_id in stale:
+            del self._sessions[session_id]
+
+    async def open(self, session_id: str, raw_pcm: bool = False) -> StreamingTranscriber:
+        """Start a new stream for the session, replacing any previous one"""
+        self._prune()
+        previous = self._sessions.pop(session_id, None)
+        if previous is not None:
+            await previous.abort()
+        if len(self._sessions) >= self.max_sessions:
+            raise RuntimeError("Too many concurrent transcription streams")
+
+        stream = StreamingTranscriber(session_id, raw_pcm=raw_pcm)
+        await stream.start()
+        self._sessions[session_id] = stream
+        return stream
+
+    def running_transcript(self, session_id: str) -> Optional[str]:
+        """Finalized text streamed so far for a session still recording"""
+        stream = self._sessions.get(session_id)
+        return stream.transcript if stream is not None else None
+
+    async def claim_transcript(self, session_id: str) -> Optional[Dict]:
+        """
+        Finalize and remove the session's stream.
+        Returns {"text", "words"} like transcribe_audio_with_timings,
+        or None when no audio was streamed for this session or the stream
+        ended before the client sent "stop" (the upload is transcribed instead).
+        """
+        stream = self._sessions.pop(session_id, None)
+        if stream is None:
+            return None
+        if not stream.finished:
+            # The client sends "stop" right before /complete; let it arrive
+            await stream.wait_finished(settings.streaming_stop_wait)
+        transcript = await stream.finish()
+        if stream.audio_bytes == 0 or not stream.complete:
+            return None
+        return {"text": transcript, "words": stream.words}
+
+
+streaming_transcriptions = StreamingTranscriptionRegistry(
+    max_sessions=settings.streaming_max_sessions,
+    finished_ttl=settings.streaming_finished_ttl,
+)
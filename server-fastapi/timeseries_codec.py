@@ -0,0 +1,123 @@
+# server-fastapi/timeseries_codec.py
+"""
+Compact binary encoding for the eye contact and posture time series.
+
+All values little-endian. Both formats start with a 2-byte tag, a version
+byte and a uint32 sample count, followed by float32 timestamps (seconds):
+
+  eye contact  b"EC" 1 <count> float32[count] timestamps, bitset of hasEyeContact
+                                  (ceil(count / 8) bytes, LSB first)
+  posture      b"PS" 1 <count> float32[count] timestamps, uint8[count] posture codes,
+                                  float32[count] confidence
+
+Posture codes index POSTURE_LABELS; unknown labels are stored as 'unknown'.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List
+
+EYE_CONTACT_TAG = b"EC"
+POSTURE_TAG = b"PS"
+VERSION = 1
+HEADER = struct.Struct("<2sBI")
+
+POSTURE_LABELS = ("unknown", "good", "slouching", "leaning")
+_POSTURE_CODES = {label: code for code, label in enumerate(POSTURE_LABELS)}
+
+
+class TimeSeriesDecodeError(ValueError):
+    """Raised for malformed or truncated blobs"""
+
+
+def _float32_bytes(values: List[float]) -> bytes:
+    packed = array("f", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _float32_values(data: bytes) -> List[float]:
+    unpacked = array("f")
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def _timestamp(value: float) -> float:
+    """Restore integer timestamps (the client sends whole seconds)"""
+    return int(value) if value.is_integer() else round(value, 3)
+
+
+def _read_header(blob: bytes, tag: bytes) -> int:
+    if len(blob) < HEADER.size:
+        raise TimeSeriesDecodeError("Blob too short")
+    blob_tag, version, count = HEADER.unpack_from(blob)
+    if blob_tag != tag or version != VERSION:
+        raise TimeSeriesDecodeError("Unexpected blob type or version")
+    return count
+
+
+def encode_eye_contact(samples: List[Dict[str, Any]]) -> bytes:
+    """[{timestamp, hasEyeContact}] -> bytes"""
+    count = len(samples)
+    bits = bytearray((count + 7) // 8)
+    for i, sample in enumerate(samples):
+        if sample.get("hasEyeContact"):
+            bits[i >> 3] |= 1 << (i & 7)
+
+    return b"".join((
+        HEADER.pack(EYE_CONTACT_TAG, VERSION, count),
+        _float32_bytes([float(sample.get("timestamp") or 0) for sample in samples]),
+        bytes(bits),
+    ))
+
+
+def decode_eye_contact(blob: bytes) -> List[Dict[str, Any]]:
+    """bytes -> [{timestamp, hasEyeContact}]"""
+    count = _read_header(blob, EYE_CONTACT_TAG)
+    offset = HEADER.size
+    timestamps_end = offset + 4 * count
+    bits = blob[timestamps_end:timestamps_end + (count + 7) // 8]
+    if len(bits) != (count + 7) // 8:
+        raise TimeSeriesDecodeError("Truncated eye contact blob")
+
+    timestamps = _float32_values(blob[offset:timestamps_end])
+    return [
+        {"timestamp": _timestamp(timestamps[i]), "hasEyeContact": bool(bits[i >> 3] >> (i & 7) & 1)}
+        for i in range(count)
+    ]
+
+
+def encode_posture(samples: List[Dict[str, Any]]) -> bytes:
+    """[{timestamp, posture, confidence}] -> bytes"""
+    return b"".join((
+        HEADER.pack(POSTURE_TAG, VERSION, len(samples)),
+        _float32_bytes([float(sample.get("timestamp") or 0) for sample in samples]),
+        bytes(_POSTURE_CODES.get(sample.get("posture"), 0) for sample in samples),
+        _float32_bytes([float(sample.get("confidence") or 0) for sample in samples]),
+    ))
+
+
+def decode_posture(blob: bytes) -> List[Dict[str, Any]]:
+    """bytes -> [{timestamp, posture, confidence}]"""
+    count = _read_header(blob, POSTURE_TAG)
+    offset = HEADER.size
+    codes_start = offset + 4 * count
+    confidence_start = codes_start + count
+    if len(blob) < confidence_start + 4 * count:
+        raise TimeSeriesDecodeError("Truncated posture blob")
+
+    timestamps = _float32_values(blob[offset:codes_start])
+    codes = blob[codes_start:confidence_start]
+    confidences = _float32_values(blob[confidence_start:confidence_start + 4 * count])
+    return [
+        {
+            "timestamp": _timestamp(timestamps[i]),
+            "posture": POSTURE_LABELS[codes[i]] if codes[i] < len(POSTURE_LABELS) else "unknown",
+            "confidence": round(confidences[i], 3),
+        }
+        for i in range(count)
+    ]
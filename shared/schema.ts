@@ -1,9 +1,15 @@
 import { sql } from "drizzle-orm";
-import { pgTable, text, varchar, integer, real, timestamp, jsonb, boolean } from "drizzle-orm/pg-core";
+import { pgTable, text, varchar, integer, real, timestamp, jsonb, boolean, customType } from "drizzle-orm/pg-core";
 import { createInsertSchema } from "drizzle-zod";
 import { z } from "zod";
 import { relations } from "drizzle-orm";
 
+const bytea = customType<{ data: Buffer }>({
+  dataType() {
+    return "bytea";
+  },
+});
+
 export const users = pgTable("users", {
   id: varchar("id").primaryKey().default(sql`gen_random_uuid()`),
   email: varchar("email").notNull().unique(),
@@ -31,6 +37,12 @@ export const sessions = pgTable("sessions", {
   improvements: jsonb("improvements").$type<string[]>().notNull(),
   eyeContactData: jsonb("eye_contact_data").$type<{ timestamp: number; hasEyeContact: boolean }[]>().notNull(),
   isPublic: boolean("is_public").default(false),
+  completedAt: timestamp("completed_at"),
+  updatedAt: timestamp("updated_at"),
+  // Compact encodings of eyeContactData / postureData (see server-fastapi/timeseries_codec.py)
+  eyeContactBlob: bytea("eye_contact_blob"),
+  postureBlob: bytea("posture_blob"),
+  analytics: jsonb("analytics").$type<Record<string, unknown>>(),
 });
 
 export const insertSessionSchema = createInsertSchema(sessions).omit({
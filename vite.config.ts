@@ -26,6 +26,7 @@ export default defineConfig({
         target: "http://localhost:8000",
         changeOrigin: true,
         secure: false,
+        ws: true,
       },
     },
   },